@@ -0,0 +1,33 @@
+#!/bin/bash
+
+# Build pre-quantized CTranslate2 Whisper models for the workers
+# Usage: scripts/build_ct2_whisper.sh [model ...]   (default: medium)
+# Output: ${MODEL_CACHE_DIR:-/models}/engines/<model>, picked up by AudioProcessor
+
+set -e
+
+ENGINE_DIR="${MODEL_CACHE_DIR:-/models}/engines"
+QUANTIZATION="${WHISPER_QUANTIZATION:-int8_float16}"
+MODELS="${@:-medium}"
+
+if ! command -v ct2-transformers-converter &> /dev/null; then
+    echo "❌ ct2-transformers-converter not found"
+    echo "   Install: pip install ctranslate2 transformers[torch]"
+    exit 1
+fi
+
+mkdir -p "$ENGINE_DIR"
+
+for model in $MODELS; do
+    hf_model="openai/whisper-$model"
+    [ "$model" = "turbo" ] && hf_model="openai/whisper-large-v3-turbo"
+
+    echo "🔧 Building $model ($QUANTIZATION) -> $ENGINE_DIR/$model"
+    ct2-transformers-converter \
+        --model "$hf_model" \
+        --output_dir "$ENGINE_DIR/$model" \
+        --copy_files tokenizer.json preprocessor_config.json \
+        --quantization "$QUANTIZATION" \
+        --force
+    echo "✅ $model ready"
+done
@@ -5,7 +5,9 @@ Removes old uploaded audio files to prevent storage accumulation
 Run this as a cron job or scheduled task
 """
 import os
+import queue
 import sys
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -13,12 +15,62 @@ from datetime import datetime, timedelta
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from minio import Minio
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 from src.config import settings
 
 # Retention period - files older than this will be deleted
 RETENTION_DAYS = int(os.getenv("S3_RETENTION_DAYS", "7"))  # Default 7 days
 
+# Log every deleted object only when VERBOSE is set - otherwise one line per batch
+VERBOSE = bool(os.getenv("VERBOSE"))
+
+# Resume listing after this key (useful when a previous run was interrupted)
+START_AFTER = os.getenv("S3_CLEANUP_START_AFTER") or None
+
+# Maximum number of keys accepted by a single S3 DeleteObjects request
+DELETE_BATCH_SIZE = 1000
+
+# Bound on keys waiting for deletion while listing continues
+DELETE_QUEUE_SIZE = 4 * DELETE_BATCH_SIZE
+
+# Sentinel telling the deleter thread that listing has finished
+_DONE = object()
+
+def delete_batch(client: Minio, bucket: str, object_names: list) -> int:
+    """Delete a batch of objects in one request, return number of failures"""
+    errors = client.remove_objects(
+        bucket,
+        (DeleteObject(name) for name in object_names)
+    )
+    failed = 0
+    for error in errors:
+        print(f"✗ Error deleting {error.name}: {error.message}")
+        failed += 1
+    return failed
+
+def deletion_worker(client: Minio, bucket: str, pending: queue.Queue, stats: dict):
+    """Consume queued keys and delete them in batches while listing continues"""
+    def flush(batch: list):
+        try:
+            stats["failed"] += delete_batch(client, bucket, batch)
+        except Exception as e:
+            # Keep draining the queue so the lister never blocks on a dead consumer
+            print(f"✗ Batch delete failed: {e}")
+            stats["failed"] += len(batch)
+    
+    batch = []
+    while True:
+        name = pending.get()
+        if name is _DONE:
+            break
+        batch.append(name)
+        if len(batch) >= DELETE_BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
 def cleanup_old_files():
     """Remove files older than retention period from MinIO"""
     
@@ -48,51 +100,76 @@ def cleanup_old_files():
             print(f"✗ Bucket '{settings.minio_bucket_name}' does not exist")
             return
         
+        # Hoist loop invariants out of the per-object loop
+        bucket = settings.minio_bucket_name
+        now = datetime.now()
+        
         # Calculate cutoff time
-        cutoff_time = datetime.now() - timedelta(days=RETENTION_DAYS)
+        cutoff_time = now - timedelta(days=RETENTION_DAYS)
         print(f"Deleting files older than: {cutoff_time}")
         print("")
         
         # List all objects in bucket
         objects = client.list_objects(
-            settings.minio_bucket_name,
+            bucket,
             prefix="uploads/",  # Only check uploaded files
-            recursive=True
+            recursive=True,
+            start_after=START_AFTER
         )
         
         deleted_count = 0
         deleted_size = 0
         skipped_count = 0
         
-        for obj in objects:
-            # Get object stat to check last modified time
-            try:
-                stat = client.stat_object(settings.minio_bucket_name, obj.object_name)
-                last_modified = stat.last_modified
-                
-                # Remove timezone info for comparison
-                if last_modified.tzinfo:
-                    last_modified = last_modified.replace(tzinfo=None)
-                
-                # Check if file is old enough to delete
-                if last_modified < cutoff_time:
-                    # Calculate age
-                    age_days = (datetime.now() - last_modified).days
-                    size_mb = obj.size / (1024 * 1024)
-                    
-                    print(f"Deleting: {obj.object_name}")
-                    print(f"  Age: {age_days} days | Size: {size_mb:.2f} MB")
-                    
-                    # Delete the object
-                    client.remove_object(settings.minio_bucket_name, obj.object_name)
+        # Deletions run on a background thread so LIST and DELETE latency overlap
+        pending = queue.Queue(maxsize=DELETE_QUEUE_SIZE)
+        deletion_stats = {"failed": 0}
+        deleter = threading.Thread(
+            target=deletion_worker,
+            args=(client, bucket, pending, deletion_stats),
+            daemon=True
+        )
+        deleter.start()
+        
+        try:
+            for obj in objects:
+                # list_objects already returns last_modified - no stat_object needed
+                try:
+                    last_modified = obj.last_modified
                     
-                    deleted_count += 1
-                    deleted_size += obj.size
-                else:
-                    skipped_count += 1
+                    # Remove timezone info for comparison
+                    if last_modified.tzinfo:
+                        last_modified = last_modified.replace(tzinfo=None)
                     
-            except Exception as e:
-                print(f"✗ Error processing {obj.object_name}: {e}")
+                    # Check if file is old enough to delete
+                    if last_modified < cutoff_time:
+                        if VERBOSE:
+                            age_days = (now - last_modified).days
+                            size_mb = obj.size / (1024 * 1024)
+                            print(f"Deleting: {obj.object_name}")
+                            print(f"  Age: {age_days} days | Size: {size_mb:.2f} MB")
+                        
+                        # Hand the object to the deleter thread
+                        pending.put(obj.object_name)
+                        
+                        deleted_count += 1
+                        deleted_size += obj.size
+                        
+                        if deleted_count % DELETE_BATCH_SIZE == 0:
+                            print(f"Queued {deleted_count} files for deletion "
+                                  f"({deleted_size / (1024 * 1024):.2f} MB)")
+                    else:
+                        skipped_count += 1
+                        
+                except Exception as e:
+                    print(f"✗ Error processing {obj.object_name}: {e}")
+        finally:
+            # Flush remaining deletions
+            pending.put(_DONE)
+            deleter.join()
+        
+        failed_count = deletion_stats["failed"]
+        deleted_count -= failed_count
         
         # Summary
         print("")
@@ -102,6 +179,8 @@ def cleanup_old_files():
         print(f"✓ Deleted files: {deleted_count}")
         print(f"✓ Freed space: {deleted_size / (1024 * 1024):.2f} MB ({deleted_size / (1024 * 1024 * 1024):.2f} GB)")
         print(f"  Kept files: {skipped_count} (within retention period)")
+        if failed_count:
+            print(f"✗ Failed deletions: {failed_count}")
         print("=" * 60)
         
     except S3Error as e:
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+pyannote ONNX Export Script
+Exports the diarization pipeline's segmentation model to ONNX for the
+ONNX Runtime (CUDA I/O binding) path in src/services/onnx_segmentation.py
+Usage: python scripts/export_pyannote_onnx.py   (requires the 'onnx' extra)
+"""
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import torch
+from pyannote.audio import Pipeline
+from src.config import settings
+from src.services.onnx_segmentation import SEGMENTATION_ONNX
+
+
+def export_segmentation(output_dir: str) -> str:
+    """Export the segmentation model with dynamic batch and sample axes"""
+    pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", token=settings.hf_token)
+    model = pipeline._segmentation.model.eval().cpu()
+
+    # One chunk of the window the pipeline slides over the audio
+    num_samples = int(model.specifications.duration * model.hparams.sample_rate)
+    dummy = torch.zeros(1, 1, num_samples)
+
+    output_path = os.path.join(output_dir, SEGMENTATION_ONNX)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            dummy,
+            output_path,
+            input_names=["waveform"],
+            output_names=["scores"],
+            dynamic_axes={
+                "waveform": {0: "batch", 2: "samples"},
+                "scores": {0: "batch", 1: "frames"},
+            },
+            opset_version=17,
+            do_constant_folding=True,
+        )
+    return output_path
+
+
+def main():
+    output_dir = settings.diarization_onnx_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"🔧 Exporting pyannote segmentation model -> {output_dir}")
+    try:
+        output_path = export_segmentation(output_dir)
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        sys.exit(1)
+
+    size_mb = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"✅ Segmentation model exported: {output_path} ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
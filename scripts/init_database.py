@@ -39,11 +39,11 @@ def check_database():
         print("🔍 Checking database connection...")
         
         db_service = DatabaseService()
-        db = db_service.get_db()
+        db_service.initialize()
         
-        # Test query
-        result = db.execute("SELECT 1").fetchone()
-        db.close()
+        # Test query on a raw connection (no ORM session)
+        if not db_service.ping():
+            raise RuntimeError("Unexpected response to SELECT 1")
         
         print("✅ Database connection successful!")
         return True
@@ -5,6 +5,8 @@ Pre-downloads Whisper models to shared volume for fast worker startup
 """
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Add src to path
@@ -12,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import whisper
 import torch
+from faster_whisper import download_model as download_faster_whisper
 from src.config import settings
 
 # Available Whisper models (ordered by size)
@@ -25,13 +28,25 @@ WHISPER_MODELS = [
     "large-v3",  # ~3 GB
 ]
 
+# Downloads are network-bound, so a few can run side by side
+MAX_PARALLEL_DOWNLOADS = int(os.getenv("MODEL_DOWNLOAD_WORKERS", "4"))
+
+# CUDA context is process-global - serialize cache clearing across threads
+_cuda_lock = threading.Lock()
+
+def iter_cache_files(directory: str):
+    """Recursively yield file DirEntry objects (stat results are cached by scandir)"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_cache_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
 def download_model(model_name: str, cache_dir: Path) -> bool:
     """Download a single model to cache directory"""
     try:
-        print(f"\n{'='*60}")
-        print(f"Downloading Whisper model: {model_name}")
-        print(f"Cache directory: {cache_dir}")
-        print(f"{'='*60}")
+        print(f"[{model_name}] Downloading Whisper model to {cache_dir}")
         
         # Download model
         model = whisper.load_model(
@@ -40,17 +55,21 @@ def download_model(model_name: str, cache_dir: Path) -> bool:
             download_root=str(cache_dir)
         )
         
-        print(f"✓ Successfully downloaded model: {model_name}")
+        # CTranslate2 conversion used by AudioProcessor (faster-whisper)
+        download_faster_whisper(model_name, cache_dir=str(cache_dir))
+        
+        print(f"[{model_name}] ✓ Successfully downloaded model")
         
         # Free memory
         del model
         if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+            with _cuda_lock:
+                torch.cuda.empty_cache()
         
         return True
         
     except Exception as e:
-        print(f"✗ Failed to download model {model_name}: {e}")
+        print(f"[{model_name}] ✗ Failed to download model: {e}")
         return False
 
 def main():
@@ -122,11 +141,17 @@ def main():
     success_count = 0
     failed_models = []
     
-    for model_name in models_to_download:
-        if download_model(model_name, cache_dir):
-            success_count += 1
-        else:
-            failed_models.append(model_name)
+    max_workers = max(1, min(MAX_PARALLEL_DOWNLOADS, len(models_to_download)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(download_model, model_name, cache_dir): model_name
+            for model_name in models_to_download
+        }
+        for future in as_completed(futures):
+            if future.result():
+                success_count += 1
+            else:
+                failed_models.append(futures[future])
     
     # Summary
     print(f"\n{'='*60}")
@@ -143,12 +168,19 @@ def main():
     print(f"Cached files in {cache_dir}:")
     print(f"{'='*60}")
     
+    # Collect (path, name, size) in one pass, then sort once
+    cached_files = []
     total_size = 0
-    for file_path in sorted(cache_dir.rglob("*")):
-        if file_path.is_file():
-            size_mb = file_path.stat().st_size / (1024 * 1024)
-            total_size += size_mb
-            print(f"  {file_path.name}: {size_mb:.2f} MB")
+    for entry in iter_cache_files(str(cache_dir)):
+        size_mb = entry.stat(follow_symlinks=False).st_size / (1024 * 1024)
+        total_size += size_mb
+        cached_files.append((entry.path, entry.name, size_mb))
+    
+    if os.getenv("VERBOSE"):
+        for _, name, size_mb in sorted(cached_files):
+            print(f"  {name}: {size_mb:.2f} MB")
+    else:
+        print(f"  {len(cached_files)} files (set VERBOSE=1 to list them)")
     
     print(f"\nTotal cache size: {total_size:.2f} MB ({total_size/1024:.2f} GB)")
     print(f"\n✓ Model initialization successful!")
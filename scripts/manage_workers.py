@@ -20,26 +20,27 @@ def get_project_root():
             return parent
     raise RuntimeError("Could not find project root (no docker-compose.yaml found)")
 
+# Resolved once at import instead of walking the filesystem in every command
+PROJECT_ROOT = get_project_root()
+
+# Shared argv prefix for all docker compose invocations
+COMPOSE = ["docker", "compose"]
+
 def scale_workers(num_workers: int):
     """Scale the number of RQ workers"""
-    project_root = get_project_root()
-    
     print(f"📊 Scaling workers to {num_workers}...")
     
     try:
-        # Change to project directory
-        os.chdir(project_root)
-        
         # Scale workers using docker compose (modern command)
-        cmd = ["docker", "compose", "up", "-d", "--scale", f"rq_worker={num_workers}"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Output is streamed straight to the terminal (no capture buffer)
+        cmd = COMPOSE + ["up", "-d", "--scale", f"rq_worker={num_workers}"]
+        result = subprocess.run(cmd, check=False)
         
         if result.returncode == 0:
             print(f"✅ Successfully scaled to {num_workers} workers")
             print("📋 Check status with: docker compose ps")
         else:
-            print(f"❌ Failed to scale workers:")
-            print(result.stderr)
+            print(f"❌ Failed to scale workers (exit code {result.returncode})")
             return False
             
     except Exception as e:
@@ -50,76 +51,55 @@ def scale_workers(num_workers: int):
 
 def get_worker_status():
     """Get current worker status"""
-    project_root = get_project_root()
-    
     try:
-        os.chdir(project_root)
-        
         # Get running containers
-        cmd = ["docker", "compose", "ps", "--filter", "name=rq_worker"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        print("📊 Current Worker Status:")
+        print("=" * 50)
+        cmd = COMPOSE + ["ps", "--filter", "name=rq_worker"]
+        result = subprocess.run(cmd, check=False)
         
-        if result.returncode == 0:
-            print("📊 Current Worker Status:")
-            print("=" * 50)
-            print(result.stdout)
-        else:
+        if result.returncode != 0:
             print("❌ Failed to get worker status")
-            print(result.stderr)
             
     except Exception as e:
         print(f"❌ Error getting worker status: {e}")
 
 def stop_all_workers():
     """Stop all workers"""
-    project_root = get_project_root()
-    
     try:
-        os.chdir(project_root)
-        
         print("🛑 Stopping all workers...")
-        cmd = ["docker", "compose", "stop", "rq_worker"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        cmd = COMPOSE + ["stop", "rq_worker"]
+        result = subprocess.run(cmd, check=False)
         
         if result.returncode == 0:
             print("✅ All workers stopped")
         else:
             print("❌ Failed to stop workers")
-            print(result.stderr)
             
     except Exception as e:
         print(f"❌ Error stopping workers: {e}")
 
 def restart_workers():
     """Restart all workers"""
-    project_root = get_project_root()
-    
     try:
-        os.chdir(project_root)
-        
         print("🔄 Restarting workers...")
-        cmd = ["docker", "compose", "restart", "rq_worker"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        cmd = COMPOSE + ["restart", "rq_worker"]
+        result = subprocess.run(cmd, check=False)
         
         if result.returncode == 0:
             print("✅ Workers restarted")
         else:
             print("❌ Failed to restart workers")
-            print(result.stderr)
             
     except Exception as e:
         print(f"❌ Error restarting workers: {e}")
 
 def show_logs():
     """Show worker logs"""
-    project_root = get_project_root()
-    
     try:
-        os.chdir(project_root)
-        
         print("📜 Worker logs (press Ctrl+C to exit):")
         print("=" * 50)
-        cmd = ["docker", "compose", "logs", "-f", "rq_worker"]
+        cmd = COMPOSE + ["logs", "-f", "rq_worker"]
         subprocess.run(cmd)
         
     except KeyboardInterrupt:
@@ -171,6 +151,9 @@ Each worker processes one transcription task at a time.
     print("🎵 Audio Diarization Worker Manager")
     print("=" * 40)
     
+    # docker compose resolves the compose file from the working directory
+    os.chdir(PROJECT_ROOT)
+    
     if args.command == 'scale':
         if args.count < 0:
             print("❌ Worker count must be positive")
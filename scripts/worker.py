@@ -7,7 +7,9 @@ Handles audio transcription tasks with intelligent resource allocation
 import sys
 import os
 import asyncio
+import atexit
 import signal
+import threading
 import time
 from datetime import datetime
 from typing import Dict, Any
@@ -15,15 +17,16 @@ from typing import Dict, Any
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from rq import Worker, Connection
+from rq import SimpleWorker, Connection
+import orjson
 import redis
 from src.config import settings
 from src.services.audio_processor import AudioProcessor
 from src.services.resource_manager import ResourceManager
 from src.services.format_service import FormatService
 
-# Initialize Redis connection
-redis_conn = redis.from_url(settings.redis_url, decode_responses=True)
+# Initialize Redis connection (raw bytes - the worker never reads back decoded strings)
+redis_conn = redis.from_url(settings.redis_url)
 
 # Initialize resource manager
 resource_manager = ResourceManager()
@@ -31,6 +34,31 @@ resource_manager = ResourceManager()
 # Initialize format service
 format_service = FormatService()
 
+# Task progress/result hashes expire after 24 hours
+TASK_KEY_TTL = 24 * 3600
+
+# Progress updates closer together than this are coalesced
+PROGRESS_MIN_INTERVAL = 1.0  # seconds
+PROGRESS_MIN_DELTA = 1.0  # percent
+
+# One event loop per worker process, reused across jobs
+_LOOP = asyncio.new_event_loop()
+asyncio.set_event_loop(_LOOP)
+atexit.register(_LOOP.close)
+
+# One AudioProcessor per worker process, built on the first job and reused
+_PROCESSOR = None
+_PROCESSOR_LOCK = threading.Lock()
+
+def _get_processor() -> AudioProcessor:
+    """Return the worker-global AudioProcessor, constructing it once"""
+    global _PROCESSOR
+    if _PROCESSOR is None:
+        with _PROCESSOR_LOCK:
+            if _PROCESSOR is None:
+                _PROCESSOR = AudioProcessor()
+    return _PROCESSOR
+
 def process_audio_task(task_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Process audio transcription task with resource management
@@ -52,50 +80,72 @@ def process_audio_task(task_data: Dict[str, Any]) -> Dict[str, Any]:
         diarization = task_data.get('diarization', True)
         
         # Create progress callback for Redis updates
+        progress_key = f"task:{task_id}:progress"
+        last_update = {"ts": 0.0, "progress": None}
+        
         def progress_callback(progress: float, message: str = ""):
+            # Coalesce bursts: skip updates within 1s that move progress < 1%
+            now = time.monotonic()
+            last_progress = last_update["progress"]
+            if (
+                last_progress is not None
+                and progress < 100.0
+                and now - last_update["ts"] < PROGRESS_MIN_INTERVAL
+                and abs(progress - last_progress) < PROGRESS_MIN_DELTA
+            ):
+                return
+            last_update["ts"] = now
+            last_update["progress"] = progress
+            
             try:
-                redis_conn.hset(f"task:{task_id}:progress", mapping={
-                    "progress": progress,
-                    "message": message,
-                    "updated_at": datetime.now().isoformat()
-                })
+                # Send HSET and EXPIRE in a single round-trip
+                with redis_conn.pipeline(transaction=False) as pipe:
+                    pipe.hset(progress_key, mapping={
+                        "progress": progress,
+                        "message": message,
+                        "updated_at": datetime.now().isoformat().encode()
+                    })
+                    pipe.expire(progress_key, TASK_KEY_TTL)
+                    pipe.execute()
             except Exception as e:
                 print(f"Failed to update progress: {e}")
         
-        # Initialize audio processor
-        processor = AudioProcessor()
+        # Reuse the loaded models from earlier jobs
+        processor = _get_processor()
         
-        # Process audio (this is async, so we need to run it in event loop)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
+        async def _run() -> Dict[str, Any]:
             # Process the audio
-            result = loop.run_until_complete(
-                processor.process_audio_sync(
-                    file_path=file_path,
-                    language=language,
-                    model=model,
-                    format_type=format_type,
-                    diarization=diarization,
-                    task_id=task_id,
-                    progress_callback=progress_callback
-                )
+            result = await processor.process_audio_sync(
+                file_path=file_path,
+                language=language,
+                model=model,
+                format_type=format_type,
+                diarization=diarization,
+                task_id=task_id,
+                progress_callback=progress_callback
             )
             
             # Convert to requested format
             if format_type != 'raw':
-                formatted_result = loop.run_until_complete(
-                    format_service.convert_to_format(result, format_type, task_id)
+                result['formatted_output'] = await format_service.convert_to_format(
+                    result, format_type, task_id
                 )
-                result['formatted_output'] = formatted_result
+            return result
+        
+        try:
+            # Run processing and formatting in a single pass on the worker loop
+            result = _LOOP.run_until_complete(_run())
             
             # Store result in Redis
-            redis_conn.hset(f"task:{task_id}:result", mapping={
-                "status": "completed",
-                "result": str(result),  # Convert to string for Redis storage
-                "completed_at": datetime.now().isoformat()
-            })
+            result_key = f"task:{task_id}:result"
+            with redis_conn.pipeline(transaction=False) as pipe:
+                pipe.hset(result_key, mapping={
+                    "status": "completed",
+                    "result": orjson.dumps(result, default=str, option=orjson.OPT_SERIALIZE_NUMPY),
+                    "completed_at": datetime.now().isoformat().encode()
+                })
+                pipe.expire(result_key, TASK_KEY_TTL)
+                pipe.execute()
             
             progress_callback(100.0, "Task completed successfully")
             
@@ -103,7 +153,6 @@ def process_audio_task(task_data: Dict[str, Any]) -> Dict[str, Any]:
             return result
             
         finally:
-            loop.close()
             # Cleanup: Unregister worker
             resource_manager.unregister_worker(worker_id)
             
@@ -112,11 +161,15 @@ def process_audio_task(task_data: Dict[str, Any]) -> Dict[str, Any]:
         
         # Store error in Redis
         try:
-            redis_conn.hset(f"task:{task_id}:result", mapping={
-                "status": "error",
-                "error": str(e),
-                "failed_at": datetime.now().isoformat()
-            })
+            result_key = f"task:{task_id}:result"
+            with redis_conn.pipeline(transaction=False) as pipe:
+                pipe.hset(result_key, mapping={
+                    "status": "error",
+                    "error": str(e),
+                    "failed_at": datetime.now().isoformat().encode()
+                })
+                pipe.expire(result_key, TASK_KEY_TTL)
+                pipe.execute()
         except:
             pass
         
@@ -131,6 +184,8 @@ def process_audio_task(task_data: Dict[str, Any]) -> Dict[str, Any]:
 def graceful_shutdown(signum, frame):
     """Handle graceful shutdown"""
     print(f"Received signal {signum}, shutting down gracefully...")
+    if _PROCESSOR is not None:
+        _PROCESSOR.cleanup_gpu_memory()
     sys.exit(0)
 
 def main():
@@ -145,7 +200,9 @@ def main():
     
     # Start the worker
     with Connection(redis_conn):
-        worker = Worker([settings.task_queue], connection=redis_conn)
+        # Jobs run in this process (no fork per job), so the processor
+        # and its models stay loaded between tasks
+        worker = SimpleWorker([settings.task_queue], connection=redis_conn)
         
         # Add custom exception handler
         def handle_exception(job, exc_type, exc_value, traceback):
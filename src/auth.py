@@ -1,19 +1,37 @@
 """
 Authentication utilities for the audio diarization service
 """
+import hmac
+from functools import lru_cache
 from fastapi import Header, HTTPException, Depends
 from .config import settings
 
+# Encode the configured key once instead of on every request
+_API_KEY_BYTES = settings.api_key.encode()
+_BEARER_PREFIX = "Bearer "
+_BEARER_PREFIX_LEN = len(_BEARER_PREFIX)
+
+@lru_cache(maxsize=1024)
+def _check_api_key(authorization: str) -> bool:
+    """Validate a bearer header - cached since only a handful of headers are ever seen"""
+    # Slice off the prefix - replace() would rescan and strip repeated prefixes
+    api_key = authorization[_BEARER_PREFIX_LEN:]
+    # Constant-time comparison avoids leaking key prefixes through timing
+    return hmac.compare_digest(api_key.encode(), _API_KEY_BYTES)
+
+def is_valid_authorization(authorization: str) -> bool:
+    """True for a bearer header carrying the configured API key"""
+    return authorization.startswith(_BEARER_PREFIX) and _check_api_key(authorization)
+
 async def verify_api_key(authorization: str = Header(None)):
     """Simple API key verification for MVP"""
-    if not authorization or not authorization.startswith("Bearer "):
+    if not authorization or not authorization.startswith(_BEARER_PREFIX):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
-    api_key = authorization.replace("Bearer ", "")
-    if api_key != settings.api_key:
+    if not _check_api_key(authorization):
         raise HTTPException(status_code=401, detail="Invalid API key")
     
-    return api_key
+    return authorization[_BEARER_PREFIX_LEN:]
 
 # Dependency for FastAPI endpoints
 ApiKeyDep = Depends(verify_api_key)
\ No newline at end of file
@@ -1,24 +1,39 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 import uvicorn
 import os
+import asyncio
+import psutil
 from datetime import datetime
 from contextlib import asynccontextmanager
 from .config import settings
 from .routers import transcription, system
 from .middleware.rate_limit import RateLimitMiddleware, TranscriptionRateLimitMiddleware
+from .middleware.upload_limit import UploadSizeLimitMiddleware
 from .services.storage_service import storage_service
 from .services.database_service import db_service
-from .utils.logger import get_logger
+from .services.resource_manager import ResourceManager
+from .utils.logger import get_logger, app_logger
 from .utils.redis_client import get_redis_client
 
 # Initialize logger
 logger = get_logger("main")
 
 
+async def _cpu_refresher(app: FastAPI):
+    """Sample CPU usage once per second so handlers never block on psutil"""
+    psutil.cpu_percent(interval=None)  # First call only sets the baseline
+    while True:
+        await asyncio.sleep(1.0)
+        app.state.cpu_percent = psutil.cpu_percent(interval=None)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
+    # Log I/O runs on a listener thread so error storms never block the event loop
+    app_logger.start_queue_listener()
     logger.info("🚀 Starting Audio Diarization Service...")
     
     # Create upload directory on startup (fallback for local storage)
@@ -46,19 +61,29 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠️ MinIO initialization error: {e}, falling back to local storage")
     
+    # Shared resource manager for the system endpoints (reuses the app's Redis client)
+    app.state.resource_manager = ResourceManager(get_redis_client())
+    
+    # Keep a cached CPU reading for the system endpoints
+    app.state.cpu_percent = 0.0
+    cpu_task = asyncio.create_task(_cpu_refresher(app))
+    
     logger.info("✅ Application startup complete")
     
     yield
     
     # Shutdown
     logger.info("👋 Shutting down Audio Diarization Service...")
+    cpu_task.cancel()
+    app_logger.stop_queue_listener()
 
 
 app = FastAPI(
     title=settings.api_title,
     description="MVP for audio transcription and diarization using Whisper and pyannote",
     version=settings.api_version,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add rate limiting middleware
@@ -72,6 +97,11 @@ app.add_middleware(
     calls=10,  # 10 transcription requests per minute
     period=60
 )
+# Outermost: oversized uploads are refused from the headers alone
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_size=settings.max_file_size
+)
 
 # Include routers (they already have /api/v1 prefix)
 app.include_router(transcription.router)
@@ -90,7 +120,7 @@ async def health_check():
         
         return {
             "status": "healthy", 
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "services": {
                 "redis": "connected",
                 "api": "running"
@@ -100,7 +130,7 @@ async def health_check():
         logger.error(f"Health check failed: {e}")
         return {
             "status": "unhealthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "error": str(e)
         }
 
@@ -1,109 +1,167 @@
 """
 Rate limiting middleware for FastAPI
 """
+import hashlib
 import time
-from collections import defaultdict, deque
-from typing import Dict, Deque
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+import orjson
+from redis.exceptions import RedisError
+from ..auth import is_valid_authorization
+from .rate_limit_lua import check_rate_limit
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware"""
-    
-    def __init__(self, app, calls: int = 60, period: int = 60):
-        super().__init__(app)
+class ASGIRateLimit:
+    """Pure ASGI rate limiter: Redis sliding-window counter with in-memory fallback"""
+
+    # Hard ceiling on tracked clients so an IP spray cannot grow the table unbounded
+    MAX_CLIENTS = 100_000
+
+    header_prefix = b"x-ratelimit"
+    limit_message = "Rate limit exceeded."
+
+    def __init__(self, app, calls: int, period: int, scope_filter: Optional[Callable[[str], bool]] = None):
+        self.app = app
         self.calls = calls
         self.period = period
-        self.clients: Dict[str, Deque[float]] = defaultdict(deque)
-        
-    def get_client_id(self, request: Request) -> str:
-        """Get client identifier (IP address)"""
-        forwarded = request.headers.get("X-Forwarded-For")
+        self._period_ns = period * 1_000_000_000
+        # Returns True for request paths this limiter applies to (None = all paths)
+        self.scope_filter = scope_filter
+        # client_id -> (window index, previous window count, current window count)
+        # Kept in least-recently-seen order, capped at MAX_CLIENTS
+        self.clients: OrderedDict[str, Tuple[int, int, int]] = OrderedDict()
+        self._last_sweep = 0
+        self._sweep_interval_ns = 300 * 1_000_000_000
+        self._limit_header = self.header_prefix + b"-limit"
+        self._remaining_header = self.header_prefix + b"-remaining"
+        self._reset_header = self.header_prefix + b"-reset"
+        # Rejections are the cheap path: body and headers are built once
+        self._429_body = orjson.dumps({
+            "detail": f"{self.limit_message} Max {calls} requests per {period} seconds."
+        })
+        self._429_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._429_body)).encode()),
+            (b"retry-after", str(period).encode()),
+        ]
+
+    def get_client_id(self, scope) -> str:
+        """Get client identifier straight from the ASGI scope: hashed valid API token, else IP"""
+        authorization = None
+        forwarded = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+            elif name == b"x-forwarded-for":
+                forwarded = value
+
+        # Behind a proxy every tenant shares a few IPs - key by token, but only a
+        # valid one: random tokens would otherwise each get a fresh bucket.
+        # Only a short digest is kept so raw keys never land in the limiter key-space.
+        if authorization and is_valid_authorization(authorization.decode("latin-1")):
+            return "tok:" + hashlib.blake2b(authorization[7:], digest_size=8).hexdigest()
         if forwarded:
-            return forwarded.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
-    
-    async def dispatch(self, request: Request, call_next):
-        # Skip rate limiting for health checks
-        if request.url.path == "/health":
-            return await call_next(request)
-            
-        client_id = self.get_client_id(request)
-        now = time.time()
-        
-        # Clean old entries
-        client_calls = self.clients[client_id]
-        while client_calls and client_calls[0] <= now - self.period:
-            client_calls.popleft()
-        
-        # Check rate limit
-        if len(client_calls) >= self.calls:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Rate limit exceeded. Max {self.calls} requests per {self.period} seconds."
+            return "ip:" + forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def _sweep(self, now: int):
+        """Drop clients with no hits in the current or previous window"""
+        window = now // self._period_ns
+        # Oldest entries come first - stop at the first client still in range
+        while self.clients:
+            client_id, (start, _, _) = next(iter(self.clients.items()))
+            if start >= window - 1:
+                break
+            del self.clients[client_id]
+
+    def _check_local(self, client_id: str, now: int):
+        """In-memory sliding-window counter on monotonic nanoseconds, used only when Redis is unreachable"""
+        if now - self._last_sweep > self._sweep_interval_ns:
+            self._sweep(now)
+            self._last_sweep = now
+
+        window = now // self._period_ns
+        entry = self.clients.get(client_id)
+        if entry is None:
+            start, prev, curr = window, 0, 0
+        else:
+            start, prev, curr = entry
+            self.clients.move_to_end(client_id)
+        if start == window - 1:
+            prev, curr = curr, 0
+        elif start != window:
+            prev, curr = 0, 0
+
+        # Integer math only - no float rounding at the window edge
+        estimated = prev * (self._period_ns - now % self._period_ns) // self._period_ns + curr
+        if estimated >= self.calls:
+            self.clients[client_id] = (window, prev, curr)
+            return False, estimated
+        self.clients[client_id] = (window, prev, curr + 1)
+        while len(self.clients) > self.MAX_CLIENTS:
+            self.clients.popitem(last=False)
+        return True, estimated + 1
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.scope_filter is not None and not self.scope_filter(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        client_id = self.get_client_id(scope)
+
+        # Check and record the hit atomically in Redis (shared across workers)
+        try:
+            allowed, count = await check_rate_limit(
+                f"rl:{self.__class__.__name__}:{client_id}", self.calls, self.period
             )
-        
-        # Add current request
-        client_calls.append(now)
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(max(0, self.calls - len(client_calls)))
-        response.headers["X-RateLimit-Reset"] = str(int(now + self.period))
-        
-        return response
-
-
-class TranscriptionRateLimitMiddleware(BaseHTTPMiddleware):
+        except RedisError:
+            # Redis unavailable - enforce per process instead
+            allowed, count = self._check_local(client_id, time.monotonic_ns())
+
+        # Check rate limit
+        if not allowed:
+            await send({"type": "http.response.start", "status": 429, "headers": self._429_headers})
+            await send({"type": "http.response.body", "body": self._429_body})
+            return
+
+        # Add rate limit headers to the response start message
+        rate_limit_headers = [
+            (self._limit_header, str(self.calls).encode()),
+            (self._remaining_header, str(max(0, self.calls - count)).encode()),
+            (self._reset_header, str(int(time.time()) + self.period).encode()),
+        ]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + rate_limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class RateLimitMiddleware(ASGIRateLimit):
+    """General API rate limiting"""
+
+    def __init__(self, app, calls: int = 60, period: int = 60):
+        # Probe/landing paths that never count against the limit
+        skip = frozenset({"/health", "/"})
+        super().__init__(app, calls, period, lambda path: path not in skip)
+
+
+class TranscriptionRateLimitMiddleware(ASGIRateLimit):
     """Stricter rate limiting for transcription endpoints"""
-    
+
+    header_prefix = b"x-transcription-ratelimit"
+    limit_message = "Transcription rate limit exceeded."
+
     def __init__(self, app, calls: int = 10, period: int = 60):
-        super().__init__(app)
-        self.calls = calls
-        self.period = period
-        self.clients: Dict[str, Deque[float]] = defaultdict(deque)
-        
-    def get_client_id(self, request: Request) -> str:
-        """Get client identifier (IP address)"""
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
-    
-    async def dispatch(self, request: Request, call_next):
-        # Only apply to transcription endpoints
-        if not request.url.path.startswith("/api/v1/transcribe"):
-            return await call_next(request)
-            
-        client_id = self.get_client_id(request)
-        now = time.time()
-        
-        # Clean old entries
-        client_calls = self.clients[client_id]
-        while client_calls and client_calls[0] <= now - self.period:
-            client_calls.popleft()
-        
-        # Check rate limit
-        if len(client_calls) >= self.calls:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Transcription rate limit exceeded. Max {self.calls} requests per {self.period} seconds."
-            )
-        
-        # Add current request
-        client_calls.append(now)
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Add rate limit headers
-        response.headers["X-Transcription-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-Transcription-RateLimit-Remaining"] = str(max(0, self.calls - len(client_calls)))
-        response.headers["X-Transcription-RateLimit-Reset"] = str(int(now + self.period))
-        
-        return response
\ No newline at end of file
+        super().__init__(app, calls, period)
+        self._prefix = "/api/v1/transcribe"
+
+    async def __call__(self, scope, receive, send):
+        # Almost all traffic leaves here after one startswith on the raw scope path
+        if scope["type"] != "http" or not scope["path"].startswith(self._prefix):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,43 @@
+"""
+Redis-backed rate limiting shared by all API worker processes
+"""
+import time
+from typing import Tuple
+from ..utils.redis_client import get_async_redis_client
+
+# Sliding-window counter: current bucket plus the weighted previous bucket.
+# Reads, checks and increments in one atomic round-trip.
+SLIDING_WINDOW_LUA = """
+local curr = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+local remaining = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local lim = tonumber(ARGV[3])
+local estimated = math.floor(prev * remaining / period) + curr
+if estimated >= lim then
+    return {0, estimated}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1, estimated + 1}
+"""
+
+# Async client so the limiter never blocks the event loop
+redis_client = get_async_redis_client()
+SCRIPT = redis_client.register_script(SLIDING_WINDOW_LUA)
+
+
+async def check_rate_limit(key: str, calls: int, period: int) -> Tuple[bool, int]:
+    """Record a hit for key, return (allowed, estimated calls in sliding window)"""
+    # Wall clock (not monotonic) so every worker agrees on window boundaries
+    now = time.time_ns()
+    period_ns = period * 1_000_000_000
+    window = now // period_ns
+    # Nanoseconds of the previous window still covered by the sliding window
+    remaining = period_ns - now % period_ns
+    allowed, count = await SCRIPT(
+        keys=[f"{key}:{window}", f"{key}:{window - 1}"],
+        # Bucket must outlive the following window, where it is read as "prev"
+        args=[remaining, period_ns, calls, period * 2]
+    )
+    return bool(allowed), int(count)
@@ -1,7 +1,8 @@
 """
 Database models for transcription results and analytics
 """
-from sqlalchemy import String, Integer, Float, DateTime, Text, Boolean, JSON
+from sqlalchemy import String, Integer, Float, DateTime, Text, Boolean, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -15,6 +16,11 @@ class TranscriptionResult(Base):
     Model for storing transcription results with metadata
     """
     __tablename__ = "transcription_results"
+    __table_args__ = (
+        # Per-token listings ordered newest first (and keyset-paginated on
+        # (created_at, task_id)) are served straight from the index
+        Index("ix_tr_token_created_task", "api_token", text("created_at DESC"), text("task_id DESC")),
+    )
     
     # Primary identification
     task_id: Mapped[str] = mapped_column(String(36), primary_key=True, index=True)  # UUID
@@ -43,7 +49,7 @@ class TranscriptionResult(Base):
     # Results
     status: Mapped[str] = mapped_column(String(20), nullable=False, default='queued')  # queued, processing, completed, failed
     transcription_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Plain text transcription
-    formatted_result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)  # Full structured result (segments, speakers, etc.)
+    formatted_result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB(none_as_null=True), nullable=True)  # Full structured result (segments, speakers, etc.)
     word_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # Number of words transcribed
     
     # Error handling
@@ -56,7 +62,7 @@ class TranscriptionResult(Base):
         return f"<TranscriptionResult(task_id='{self.task_id}', status='{self.status}')>"
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for API responses"""
+        """Convert to dictionary for API responses (datetimes are serialized by orjson)"""
         return {
             'task_id': self.task_id,
             'status': self.status,
@@ -66,9 +72,9 @@ class TranscriptionResult(Base):
             'model': self.model,
             'format_type': self.format_type,
             'diarization_enabled': self.diarization_enabled,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
             'processing_time_seconds': self.processing_time_seconds,
             'audio_duration_seconds': self.audio_duration_seconds,
             'transcription_text': self.transcription_text,
@@ -87,8 +93,8 @@ class TranscriptionResult(Base):
             'language': self.language,
             'detected_language': self.detected_language,
             'model': self.model,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at,
+            'completed_at': self.completed_at,
             'processing_time_seconds': self.processing_time_seconds,
             'audio_duration_seconds': self.audio_duration_seconds,
             'word_count': self.word_count,
@@ -100,6 +106,9 @@ class ApiUsageStats(Base):
     Model for tracking API usage statistics
     """
     __tablename__ = "api_usage_stats"
+    __table_args__ = (
+        Index("ix_usage_token_date", "api_token", "date"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     api_token: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -1,16 +1,34 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any
 import psutil
 import torch
 from rq import Queue, Worker
-from ..services.resource_manager import ResourceManager
+from rq.utils import utcparse
 from ..config import settings
 from ..utils.logger import get_logger
 from ..utils.redis_client import get_redis_client
+from ..utils.cache import redis_memoize
 
-router = APIRouter(prefix="/api/v1/system", tags=["system"])
+router = APIRouter(prefix="/api/v1/system", tags=["system"], default_response_class=ORJSONResponse)
 logger = get_logger("system")
 
+# Settings are fixed after startup - bind them once instead of per request
+TASK_QUEUE = settings.task_queue
+MAX_WORKERS = settings.max_workers
+TASK_TIMEOUT = settings.task_timeout
+
+# Device properties never change after init - query them once
+_GPU_PROPS = [
+    torch.cuda.get_device_properties(i) for i in range(torch.cuda.device_count())
+] if torch.cuda.is_available() else []
+
+
+def _collect_gpu_stats():
+    """Yield (index, props, allocated, reserved) - only memory counters are queried per call"""
+    for i, props in enumerate(_GPU_PROPS):
+        yield i, props, torch.cuda.memory_allocated(i), torch.cuda.memory_reserved(i)
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint with worker status"""
@@ -20,7 +38,7 @@ async def health_check():
         redis_client.ping()
         
         # Check RQ workers
-        queue = Queue(settings.task_queue, connection=redis_client)
+        queue = Queue(TASK_QUEUE, connection=redis_client)
         workers = Worker.all(connection=redis_client)
         active_workers = [w for w in workers if w.state == 'busy' or w.state == 'idle']
         
@@ -29,11 +47,11 @@ async def health_check():
             "workers": {
                 "total": len(workers),
                 "active": len(active_workers),
-                "max_configured": settings.max_workers
+                "max_configured": MAX_WORKERS
             },
             "queue": {
                 "pending_jobs": len(queue),
-                "queue_name": settings.task_queue
+                "queue_name": TASK_QUEUE
             }
         }
     except Exception as e:
@@ -44,43 +62,59 @@ async def health_check():
         }
 
 @router.get("/stats")
-async def get_system_stats():
+@redis_memoize(ttl=2)
+async def get_system_stats(request: Request):
     """Get detailed system and worker statistics"""
     try:
         # Redis connection
         redis_client = get_redis_client()
         
         # Worker information
-        queue = Queue(settings.task_queue, connection=redis_client)
-        workers = Worker.all(connection=redis_client)
+        queue = Queue(TASK_QUEUE, connection=redis_client)
+        
+        # Round-trip 1: worker keys and all queue/registry sizes
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.smembers(Worker.redis_workers_keys)
+        pipe.llen(queue.key)
+        pipe.zcard(queue.failed_job_registry.key)
+        pipe.zcard(queue.started_job_registry.key)
+        pipe.zcard(queue.finished_job_registry.key)
+        worker_keys, pending, failed, started, finished = pipe.execute()
+        
+        # Round-trip 2: every worker hash at once
+        worker_keys = sorted(worker_keys)
+        pipe = redis_client.pipeline(transaction=False)
+        for key in worker_keys:
+            pipe.hmget(key, "state", "current_job", "last_heartbeat", "birth")
+        worker_rows = pipe.execute()
         
         worker_stats = []
-        for worker in workers:
+        for key, (state, current_job, last_heartbeat, birth) in zip(worker_keys, worker_rows):
+            if state is None and last_heartbeat is None:
+                continue  # Worker hash expired after registration
             worker_info = {
-                "name": worker.name,
-                "state": worker.state,
-                "current_job": worker.get_current_job_id(),
-                "last_heartbeat": worker.last_heartbeat.isoformat() if worker.last_heartbeat else None,
+                "name": key[len(Worker.redis_worker_namespace_prefix):],
+                "state": state or "?",
+                "current_job": current_job,
+                "last_heartbeat": utcparse(last_heartbeat).isoformat() if last_heartbeat else None,
             }
-            # birth_date attribute was removed in newer RQ versions
-            if hasattr(worker, 'birth_date'):
-                worker_info["birth"] = worker.birth_date.isoformat()
-            elif hasattr(worker, 'birth'):
-                worker_info["birth"] = worker.birth.isoformat()
+            if birth:
+                worker_info["birth"] = utcparse(birth).isoformat()
             worker_stats.append(worker_info)
         
-        # Queue statistics
+        # Queue statistics (raw counts - no registry cleanup on read)
         queue_stats = {
-            "pending_jobs": len(queue),
-            "failed_jobs": len(queue.failed_job_registry),
-            "started_jobs": len(queue.started_job_registry),
-            "finished_jobs": len(queue.finished_job_registry)
+            "pending_jobs": pending,
+            "failed_jobs": failed,
+            "started_jobs": started,
+            "finished_jobs": finished
         }
         
         # System resources
         memory = psutil.virtual_memory()
         system_stats = {
-            "cpu_percent": psutil.cpu_percent(interval=1),
+            # Refreshed in the background by the app lifespan
+            "cpu_percent": request.app.state.cpu_percent,
             "memory_percent": memory.percent,
             "memory_available_gb": memory.available / (1024**3),
             "memory_total_gb": memory.total / (1024**3)
@@ -88,33 +122,30 @@ async def get_system_stats():
         
         # GPU information
         gpu_stats = {}
-        if torch.cuda.is_available():
-            for i in range(torch.cuda.device_count()):
-                props = torch.cuda.get_device_properties(i)
-                memory_allocated = torch.cuda.memory_allocated(i)
-                memory_total = props.total_memory
-                
-                gpu_stats[f"gpu_{i}"] = {
-                    "name": props.name,
-                    "memory_used_gb": memory_allocated / (1024**3),
-                    "memory_total_gb": memory_total / (1024**3),
-                    "memory_percent": (memory_allocated / memory_total) * 100
-                }
+        for i, props, memory_allocated, _ in _collect_gpu_stats():
+            memory_total = props.total_memory
+            
+            gpu_stats[f"gpu_{i}"] = {
+                "name": props.name,
+                "memory_used_gb": memory_allocated / (1024**3),
+                "memory_total_gb": memory_total / (1024**3),
+                "memory_percent": (memory_allocated / memory_total) * 100
+            }
         
         return {
             "workers": {
-                "total": len(workers),
-                "active": len([w for w in workers if w.state in ['busy', 'idle']]),
-                "max_configured": settings.max_workers,
+                "total": len(worker_stats),
+                "active": len([w for w in worker_stats if w["state"] in ['busy', 'idle']]),
+                "max_configured": MAX_WORKERS,
                 "details": worker_stats
             },
             "queue": queue_stats,
             "system": system_stats,
             "gpu": gpu_stats,
             "configuration": {
-                "max_workers": settings.max_workers,
+                "max_workers": MAX_WORKERS,
                 "tasks_per_worker": 1,  # RQ workers handle 1 task at a time (by design)
-                "task_timeout": settings.task_timeout
+                "task_timeout": TASK_TIMEOUT
             }
         }
         
@@ -125,10 +156,11 @@ async def get_system_stats():
         )
 
 @router.get("/resources")
-async def get_resource_usage():
+@redis_memoize(ttl=2)
+async def get_resource_usage(request: Request):
     """Get current resource usage and worker status"""
     try:
-        resource_manager = ResourceManager()
+        resource_manager = request.app.state.resource_manager
         
         # System resources
         memory = psutil.virtual_memory()
@@ -140,28 +172,23 @@ async def get_resource_usage():
             },
             "cpu": {
                 "count": psutil.cpu_count(),
-                "usage": psutil.cpu_percent(interval=1)
+                "usage": request.app.state.cpu_percent
             }
         }
         
         # GPU resources
         gpu_resources = {}
-        if torch.cuda.is_available():
-            gpu_count = torch.cuda.device_count()
-            for i in range(gpu_count):
-                props = torch.cuda.get_device_properties(i)
-                memory_allocated = torch.cuda.memory_allocated(i)
-                memory_cached = torch.cuda.memory_reserved(i)
-                memory_total = props.total_memory
-                
-                gpu_resources[f"gpu_{i}"] = {
-                    "name": props.name,
-                    "total_memory": memory_total,
-                    "allocated_memory": memory_allocated,
-                    "cached_memory": memory_cached,
-                    "free_memory": memory_total - memory_cached,
-                    "utilization_percent": (memory_cached / memory_total) * 100
-                }
+        for i, props, memory_allocated, memory_cached in _collect_gpu_stats():
+            memory_total = props.total_memory
+            
+            gpu_resources[f"gpu_{i}"] = {
+                "name": props.name,
+                "total_memory": memory_total,
+                "allocated_memory": memory_allocated,
+                "cached_memory": memory_cached,
+                "free_memory": memory_total - memory_cached,
+                "utilization_percent": (memory_cached / memory_total) * 100
+            }
         
         # Worker status
         worker_status = resource_manager.get_all_workers()
@@ -183,10 +210,11 @@ async def get_resource_usage():
         )
 
 @router.get("/models")
-async def get_model_availability():
+@redis_memoize(ttl=2)
+async def get_model_availability(request: Request):
     """Get available models and their resource requirements"""
     try:
-        resource_manager = ResourceManager()
+        resource_manager = request.app.state.resource_manager
         
         model_info = {}
         for model_spec in resource_manager.model_specs.values():
@@ -212,10 +240,10 @@ async def get_model_availability():
         )
 
 @router.post("/workers/cleanup")
-async def cleanup_stale_workers():
+async def cleanup_stale_workers(request: Request):
     """Clean up stale worker registrations"""
     try:
-        resource_manager = ResourceManager()
+        resource_manager = request.app.state.resource_manager
         cleaned_count = resource_manager.cleanup_stale_workers()
         
         return {
@@ -1,24 +1,42 @@
+import asyncio
 import os
-import uuid
 import aiofiles
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Header
-from typing import Literal, Optional
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Header, Request, Response
+from fastapi.responses import ORJSONResponse
+from typing import Literal, Optional, get_args
 from ..config import settings
 from ..auth import verify_api_key, ApiKeyDep
-from ..services.audio_utils import get_audio_duration, convert_audio_to_wav_16khz
+from ..schemas.requests import WhisperModelName, LANG_RE
+from ..services.audio_utils import probe_duration
 from ..services.rq_task_manager import get_task_manager
 from ..services.url_downloader import url_downloader
 from ..services.storage_service import storage_service
-from ..services.result_service import result_service
+from ..services.result_service import result_etag, result_service
+from ..utils.ids import new_uuid7
 from ..utils.logger import get_logger
 
-router = APIRouter(prefix="/api/v1", tags=["transcription"])
+router = APIRouter(prefix="/api/v1", tags=["transcription"], default_response_class=ORJSONResponse)
 logger = get_logger("transcription")
 
 # Initialize task manager
 task_manager = get_task_manager()
 
+# Immutable whitelists, bound once at import
+ALLOWED_EXTENSIONS = settings.allowed_audio_extensions
+ALLOWED_MODEL_NAMES = get_args(WhisperModelName)
+ALLOWED_MODELS = frozenset(ALLOWED_MODEL_NAMES)
+
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Bounds how many uploads are streamed to disk and probed at once, so a burst
+# of requests queues here instead of exhausting disk bandwidth and memory
+_upload_sem = asyncio.Semaphore(settings.max_concurrent_uploads)
+
+# Results can be deleted - clients keep them but revalidate (a cheap 304) on every use
+RESULT_CACHE_CONTROL = "private, no-cache"
+
 async def download_audio_from_url(url: str, task_id: str) -> str:
     """Download audio file from URL using yt-dlp for better support"""
     try:
@@ -29,18 +47,19 @@ async def download_audio_from_url(url: str, task_id: str) -> str:
             upload_dir=settings.upload_dir
         )
         
-        # Convert to 16kHz WAV for optimal Whisper processing
-        wav_path = await convert_audio_to_wav_16khz(file_path)
-        
-        # Remove original file if conversion was successful and different
-        if wav_path != file_path:
-            os.remove(file_path)
-        
-        return wav_path
+        # Conversion to 16kHz WAV happens in the worker
+        return file_path
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to download audio: {str(e)}")
 
+async def _probe_or_400(file_path: str) -> float:
+    """Audio duration in seconds; anything unreadable is rejected as a bad upload"""
+    try:
+        return await probe_duration(file_path)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid audio file: {str(e)}")
+
 @router.post("/transcribe")
 async def transcribe_audio(
     file: UploadFile = File(None),
@@ -54,6 +73,9 @@ async def transcribe_audio(
     """
     Transcribe audio file or URL using Whisper and pyannote for diarization
     """
+    file_path = None
+    storage_path = None
+    enqueued = False  # Until then, every exit removes the upload (locally and in storage)
     try:
         # Validate input - either file or URL, not both
         if not file and not url:
@@ -63,15 +85,14 @@ async def transcribe_audio(
             raise HTTPException(status_code=400, detail="Provide either file or URL, not both")
         
         # Validate model parameter
-        allowed_models = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3", "turbo"]
-        if model not in allowed_models:
+        if model not in ALLOWED_MODELS:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Invalid model. Allowed: {allowed_models}"
+                detail=f"Invalid model. Allowed: {list(ALLOWED_MODEL_NAMES)}"
             )
         
         # Validate language parameter
-        if lang != "auto" and len(lang) != 2:
+        if LANG_RE.fullmatch(lang) is None:
             raise HTTPException(
                 status_code=400, 
                 detail="Language must be 'auto' or 2-letter ISO code"
@@ -80,10 +101,8 @@ async def transcribe_audio(
         # Note: Concurrency is now controlled by worker count, not artificial limits
         # RQ will queue tasks if all workers are busy
         
-        file_path = None
-        storage_path = None  # Initialize storage path
         original_filename = None
-        task_id = str(uuid.uuid4())  # Generate task ID upfront
+        task_id = new_uuid7()  # Generate task ID upfront (time-ordered for index locality)
         
         if file:
             # Handle file upload
@@ -91,92 +110,59 @@ async def transcribe_audio(
             
             # Validate file extension
             file_extension = Path(file.filename).suffix.lower()
-            if file_extension not in settings.allowed_audio_extensions:
+            if file_extension not in ALLOWED_EXTENSIONS:
                 raise HTTPException(
                     status_code=400, 
-                    detail=f"Unsupported file format. Allowed: {list(settings.allowed_audio_extensions)}"
+                    detail=f"Unsupported file format. Allowed: {sorted(ALLOWED_EXTENSIONS)}"
                 )
             
-            # Check file size
-            file.file.seek(0, 2)  # Seek to end
-            file_size = file.file.tell()
-            file.file.seek(0)  # Reset to beginning
-            
-            if file_size > settings.max_file_size:
-                raise HTTPException(
-                    status_code=413, 
-                    detail=f"File too large. Maximum size: {settings.max_file_size/1024/1024:.1f}MB"
-                )
+            # Stream the upload to disk in 1 MiB chunks, enforcing the size limit on the fly
+            async with _upload_sem:
+                os.makedirs(settings.upload_dir, exist_ok=True)
+                file_path = os.path.join(settings.upload_dir, f"{task_id}_upload{file_extension}")
+                file_size = 0
+                async with aiofiles.open(file_path, 'wb') as out_f:
+                    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                        file_size += len(chunk)
+                        if file_size > settings.max_file_size:
+                            break
+                        await out_f.write(chunk)
             
-            # Read file content once
-            file_content = await file.read()
+                if file_size > settings.max_file_size:
+                    raise HTTPException(
+                        status_code=413, 
+                        detail=f"File too large. Maximum size: {settings.max_file_size/1024/1024:.1f}MB"
+                    )
             
-            # Save uploaded file using storage service (pass bytes directly)
-            from io import BytesIO
-            file_stream = BytesIO(file_content)
-            storage_path = await storage_service.save_upload_file(file_stream, original_filename, task_id)
+                # Header-only probe - over-long audio is rejected before anything is stored
+                duration = await _probe_or_400(file_path)
             
-            # Download file for processing (will be local path or temp file)
-            file_path = await storage_service.download_file(storage_path)
-            
-            # Convert to 16kHz WAV for optimal Whisper processing
-            wav_file_path = await convert_audio_to_wav_16khz(file_path)
-            
-            # Get duration before uploading (wav_file_path is local)
-            duration = await get_audio_duration(wav_file_path)
-            
-            # Upload converted WAV to storage for workers to access
-            if wav_file_path != file_path:
-                # Save converted WAV to storage
-                try:
-                    with open(wav_file_path, 'rb') as wav_f:
-                        from io import BytesIO
-                        wav_content = wav_f.read()
-                        wav_stream = BytesIO(wav_content)
-                        wav_storage_path = await storage_service.save_upload_file(
-                            wav_stream, 
-                            f"{task_id}_converted.wav", 
-                            task_id
-                        )
-                except Exception as e:
-                    logger.error(f"ERROR uploading converted WAV: {e}", exc_info=True)
-                    raise
-                
-                # Clean up local temp files
-                try:
-                    if os.path.exists(file_path) and file_path != storage_path:
-                        os.remove(file_path)
-                    if os.path.exists(wav_file_path):
-                        os.remove(wav_file_path)
-                except:
-                    pass
-                
-                # Use the storage path for the converted file
-                storage_path = wav_storage_path
-        
         elif url:
             # Handle URL download
             file_path = await download_audio_from_url(url, task_id)
             original_filename = Path(url).name or f"download{Path(file_path).suffix}"
             # Get duration for URL downloads
-            duration = await get_audio_duration(file_path)
+            duration = await _probe_or_400(file_path)
         
         # Validate duration
-        try:
-            if duration > settings.max_duration_seconds:
-                raise HTTPException(
-                    status_code=413, 
-                    detail=f"Audio too long. Maximum duration: {settings.max_duration_hours} hours ({duration/3600:.1f} hours provided)"
-                )
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid audio file: {str(e)}")
+        if duration > settings.max_duration_seconds:
+            raise HTTPException(
+                status_code=413, 
+                detail=f"Audio too long. Maximum duration: {settings.max_duration_hours} hours ({duration/3600:.1f} hours provided)"
+            )
+        
+        if file and storage_service.is_local:
+            # Local storage: the streamed file already is the stored upload
+            storage_path = file_path
+        elif file:
+            storage_path = await storage_service.save_upload_path(file_path, original_filename, task_id)
+            # The worker fetches the upload from storage - drop the local copy
+            await asyncio.to_thread(os.remove, file_path)
         
         # Create initial database record
         file_size_bytes = None
         if file:
-            file_size_bytes = len(file_content)
+            file_size_bytes = file_size
         
         request_metadata = {
             'original_filename': original_filename,
@@ -189,7 +175,6 @@ async def transcribe_audio(
             'storage_path': storage_path if file else None
         }
         
-        # Create initial database record
         await result_service.create_initial_record(
             task_id=task_id,
             api_token=api_key,
@@ -198,7 +183,10 @@ async def transcribe_audio(
         
         # Create and queue the RQ task with all parameters
         # Pass task_id so RQ uses the same ID as the database record
-        rq_task_id = await task_manager.create_task(
+        # Batchable requests go through src/rq_batcher.py, which groups
+        # compatible ones (same model/language/diarization) into one job
+        enqueue = task_manager.enqueue_batchable if settings.use_batching else task_manager.create_task
+        rq_task_id = await enqueue(
             task_id=task_id,  # Pass the task_id to ensure consistency
             file_path=file_path,
             storage_path=storage_path,  # Pass storage path for cleanup
@@ -207,8 +195,11 @@ async def transcribe_audio(
             format_type=format,
             diarization=diarization,
             original_filename=original_filename,
-            api_token=api_key  # Pass API token to task
+            api_token=api_key,  # Pass API token to task
+            audio_duration_seconds=duration,  # Lets the batcher skip probing long files
+            needs_conversion=True  # Worker decodes to 16kHz PCM and removes the upload afterwards
         )
+        enqueued = True
         
         # Verify the task ID matches
         if rq_task_id != task_id:
@@ -224,10 +215,14 @@ async def transcribe_audio(
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"ERROR in transcribe endpoint: {e}")
-        print(traceback.format_exc())
+        logger.exception("Transcribe request failed")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        if not enqueued:
+            if file_path:
+                await asyncio.to_thread(Path(file_path).unlink, missing_ok=True)
+            if storage_path and storage_path != file_path:
+                await storage_service.delete_file(storage_path)
 
 @router.get("/status/{task_id}")
 async def get_task_status(task_id: str, api_key: str = Depends(verify_api_key)):
@@ -248,7 +243,12 @@ async def get_task_status(task_id: str, api_key: str = Depends(verify_api_key)):
         raise HTTPException(status_code=500, detail=f"Error retrieving task status: {str(e)}")
 
 @router.get("/result/{task_id}")
-async def get_transcription_result(task_id: str, api_key: str = Depends(verify_api_key)):
+async def get_transcription_result(
+    task_id: str,
+    request: Request,
+    response: Response,
+    api_key: str = Depends(verify_api_key)
+):
     """
     Get full transcription result with Redis → PostgreSQL fallback
     
@@ -256,6 +256,9 @@ async def get_transcription_result(task_id: str, api_key: str = Depends(verify_a
     1. Check Redis cache first (fast)
     2. If not found, check PostgreSQL database
     3. Cache database result in Redis for future requests
+    
+    Completed results carry an ETag (a hash of the stored result); a matching
+    If-None-Match gets a 304 without the transcript being sent again.
     """
     try:
         result = await result_service.get_transcription_result(task_id)
@@ -265,6 +268,12 @@ async def get_transcription_result(task_id: str, api_key: str = Depends(verify_a
         
         # Return appropriate response based on status
         if result['status'] == 'completed':
+            # Stored with the result; only results cached before ETags were stored are hashed here
+            etag = result.get('etag') or result_etag(task_id, result.get('result'))
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": RESULT_CACHE_CONTROL})
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = RESULT_CACHE_CONTROL
             return {
                 'task_id': task_id,
                 'status': 'completed',
@@ -299,9 +308,15 @@ async def get_transcription_result(task_id: str, api_key: str = Depends(verify_a
 async def get_transcription_history(
     limit: int = 20,
     offset: int = 0,
+    after_task_id: Optional[str] = None,
     api_key: str = Depends(verify_api_key)
 ):
-    """Get transcription history for the current API token"""
+    """
+    Get transcription history for the current API token
+    
+    Pass the previous response's next_cursor as after_task_id to page;
+    offset is kept for older clients and costs O(offset) in the database.
+    """
     try:
         if limit > 100:
             limit = 100  # Prevent excessive queries
@@ -309,14 +324,16 @@ async def get_transcription_history(
         transcriptions = await result_service.list_user_transcriptions(
             api_token=api_key,
             limit=limit,
-            offset=offset
+            offset=offset,
+            after_task_id=after_task_id
         )
         
         return {
             'transcriptions': transcriptions,
             'count': len(transcriptions),
             'limit': limit,
-            'offset': offset
+            'offset': offset,
+            'next_cursor': transcriptions[-1]['task_id'] if len(transcriptions) == limit else None
         }
         
     except Exception as e:
@@ -338,32 +355,6 @@ async def delete_transcription(task_id: str, api_key: str = Depends(verify_api_k
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting transcription: {str(e)}")
 
-@router.get("/result/{task_id}")
-async def get_task_result(task_id: str, api_key: str = Depends(verify_api_key)):
-    """Get transcription task result"""
-    try:
-        status = await task_manager.get_task_status(task_id)
-        
-        if not status:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        if status["status"] != "completed":
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Task is {status['status']}, not completed"
-            )
-        
-        result = status.get("result")
-        if not result:
-            raise HTTPException(status_code=404, detail="Result not found")
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving task result: {str(e)}")
-
 @router.delete("/cancel/{task_id}")
 async def cancel_task(task_id: str, api_key: str = Depends(verify_api_key)):
     """Cancel a transcription task"""
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+RQ Batcher - groups compatible transcription requests into batched jobs
+Requests queued by task_manager.enqueue_batchable wait in per-(model, language,
+diarization) lists; the batcher drains up to BATCH_MAX_SIZE of them within
+BATCH_WINDOW_MS and enqueues one job for the regular RQ workers.
+"""
+import os
+import time
+import orjson
+import redis
+from rq import Queue
+from .config import settings
+from .services.rq_task_manager import BATCH_GROUPS_KEY, batch_group_key, discard_empty_group
+from .utils.logger import get_logger
+
+logger = get_logger("rq_batcher")
+
+BATCH_TASK = "src.services.audio_tasks.process_transcription_batch"
+SINGLE_TASK = "src.services.audio_tasks.process_transcription_task"
+
+
+def collect_batch(redis_conn: redis.Redis):
+    """Block for the first pending request, then gather compatible ones until the window closes"""
+    group_keys = list(redis_conn.smembers(BATCH_GROUPS_KEY))
+    if not group_keys:
+        time.sleep(1)
+        return []
+
+    popped = redis_conn.blpop(group_keys, timeout=1)
+    if popped is None:
+        # Nothing waiting anywhere: forget the drained groups
+        for group_key in group_keys:
+            discard_empty_group(redis_conn, group_key)
+        return []
+
+    group_key, first = popped
+    batch = [orjson.loads(first)]
+    deadline = time.monotonic() + settings.batch_window_ms / 1000
+
+    while len(batch) < settings.batch_max_size:
+        # Take whatever is already waiting in one round-trip
+        items = redis_conn.lpop(group_key, settings.batch_max_size - len(batch))
+        if items:
+            batch.extend(orjson.loads(item) for item in items)
+            continue
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        popped = redis_conn.blpop([group_key], timeout=remaining)
+        if popped is None:
+            break
+        batch.append(orjson.loads(popped[1]))
+
+    discard_empty_group(redis_conn, group_key)
+    return batch
+
+
+def enqueue_batch(queue: Queue, batch: list):
+    """Enqueue one RQ job for the batch (a lone request keeps its own job id)"""
+    if len(batch) == 1:
+        return queue.enqueue(
+            SINGLE_TASK,
+            **batch[0],
+            job_id=batch[0]["task_id"],
+            job_timeout='8h',
+            result_ttl=86400,
+            failure_ttl=3600
+        )
+    return queue.enqueue(
+        BATCH_TASK,
+        batch,
+        job_timeout='8h',
+        result_ttl=86400,
+        failure_ttl=3600
+    )
+
+
+def main():
+    """Batcher entry point"""
+    redis_conn = redis.from_url(settings.redis_url)
+    queue = Queue(settings.task_queue, connection=redis_conn)
+
+    print("=" * 60)
+    print(f"Starting RQ Batcher: batcher-{os.getpid()}")
+    print("=" * 60)
+    print(f"Connected to Redis: {settings.redis_url}")
+    print(f"Target queue: {settings.task_queue}")
+    print(f"Max batch size: {settings.batch_max_size}")
+    print(f"Batch window: {settings.batch_window_ms}ms")
+    print("=" * 60)
+
+    while True:
+        try:
+            batch = collect_batch(redis_conn)
+        except redis.RedisError as e:
+            logger.error(f"❌ Redis error while collecting batch: {e}")
+            time.sleep(1)
+            continue
+
+        if not batch:
+            continue
+
+        try:
+            job = enqueue_batch(queue, batch)
+            logger.info(f"📦 Enqueued job {job.id} with {len(batch)} task(s)")
+        except Exception as e:
+            # Put the requests back at the head of their queue for the next round
+            logger.error(f"❌ Failed to enqueue batch, requeueing: {e}")
+            group_key = batch_group_key(
+                batch[0].get("model"), batch[0].get("language"), batch[0].get("diarization")
+            )
+            redis_conn.lpush(group_key, *(orjson.dumps(job) for job in reversed(batch)))
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,18 @@ RQ Worker for processing transcription tasks
 Each worker processes only ONE task at a time for GPU memory safety
 """
 import os
+import socket
 import sys
 from pathlib import Path
 
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from rq import Worker
+from rq import SimpleWorker
 import redis
 from config import settings
 from services.database_service import db_service
+from utils.gpu import enable_tf32
 from utils.logger import get_logger
 
 logger = get_logger("rq_worker")
@@ -28,15 +30,33 @@ def main():
         logger.error(f"❌ Failed to initialize database in RQ worker: {e}")
         sys.exit(1)
     
-    # Connect to Redis
-    redis_conn = redis.from_url(settings.redis_url)
+    # TF32 matmuls for every job this process runs (RQ jobs never build an AudioProcessor)
+    enable_tf32()
+    
+    # Connect to Redis through one pool reused by every job this worker runs.
+    # Keepalive and health checks keep idle connections from being silently
+    # dropped between long jobs and re-dialed under load.
+    pool = redis.ConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=32,
+        socket_keepalive=True,
+        socket_keepalive_options={
+            socket.TCP_KEEPIDLE: 60,
+            socket.TCP_KEEPINTVL: 10,
+            socket.TCP_KEEPCNT: 3
+        },
+        health_check_interval=30
+    )
+    redis_conn = redis.Redis(connection_pool=pool)
     
     # Create worker with specific queue
     # CRITICAL: burst=False means worker stays alive and processes tasks sequentially
     # name parameter helps identify individual workers in logs
     worker_name = f"worker-{os.getpid()}"
     
-    worker = Worker(
+    # SimpleWorker runs jobs in this process instead of a fork per job,
+    # so models loaded by one task are still in memory for the next
+    worker = SimpleWorker(
         [settings.task_queue],
         connection=redis_conn,
         name=worker_name
@@ -48,6 +68,7 @@ def main():
     print(f"Connected to Redis: {settings.redis_url}")
     print(f"Listening on queue: {settings.task_queue}")
     print(f"Tasks per worker: 1 (RQ workers are single-threaded by design)")
+    print(f"Job execution: in-process (models persist between tasks)")
     print(f"Task Timeout: {settings.task_timeout}s")
     print(f"Model Cache: {settings.model_cache_dir} (readonly)")
     print(f"Total workers: Managed by docker-compose replicas")
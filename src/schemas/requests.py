@@ -1,11 +1,18 @@
-from pydantic import BaseModel, Field, validator
+import re
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Literal
 from datetime import datetime
 
+# Whisper model sizes accepted by the API - validated by pydantic-core, no Python callback
+WhisperModelName = Literal["tiny", "base", "small", "medium", "large", "large-v2", "large-v3", "turbo"]
+
+# 'auto' or a 2-letter ISO code, compiled once
+LANG_RE = re.compile(r"auto|[a-z]{2}")
+
 class TranscribeRequest(BaseModel):
     """Schema for transcription request parameters"""
     lang: str = Field(default="auto", description="Language code or 'auto' for detection")
-    model: str = Field(default="medium", description="Whisper model size")
+    model: WhisperModelName = Field(default="medium", description="Whisper model size")
     format: Literal["text", "json", "srt", "vtt", "pdf", "docx"] = Field(
         default="json", 
         description="Output format"
@@ -13,16 +20,10 @@ class TranscribeRequest(BaseModel):
     diarization: bool = Field(default=True, description="Enable speaker diarization")
     url: Optional[str] = Field(default=None, description="Audio file URL (alternative to file upload)")
     
-    @validator('model')
-    def validate_model(cls, v):
-        allowed_models = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3", "turbo"]
-        if v not in allowed_models:
-            raise ValueError(f"Model must be one of: {allowed_models}")
-        return v
-    
-    @validator('lang')
-    def validate_lang(cls, v):
-        if v != "auto" and len(v) != 2:
+    @field_validator('lang')
+    @classmethod
+    def validate_lang(cls, v: str) -> str:
+        if LANG_RE.fullmatch(v) is None:
             raise ValueError("Language must be 'auto' or 2-letter ISO code")
         return v
 
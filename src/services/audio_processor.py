@@ -1,10 +1,13 @@
-import whisper
+import av
+import numpy as np
 import torch
-from pyannote.audio import Pipeline
-import subprocess
-import json
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from faster_whisper.feature_extractor import FeatureExtractor
+import asyncio
 import os
+import threading
 import time
+from collections import OrderedDict
 from datetime import timedelta
 from typing import Dict, Any, Optional, List
 from pathlib import Path
@@ -20,16 +23,116 @@ from .audio_utils import convert_audio_if_needed
 from .model_cache import model_cache
 from .resource_manager import ResourceManager
 
+# settings.cpu_quant -> CTranslate2 compute type for CPU-only workers
+CPU_COMPUTE_TYPES = {"none": "float32", "int8": "int8", "int16": "int16"}
+
+# Whisper and pyannote both take 16 kHz mono float32
+SAMPLE_RATE = 16000
+
+# One row per diarization turn - kept as arrays until the result is serialized
+TURN_DTYPE = np.dtype([("start", "f8"), ("end", "f8"), ("speaker", "U32")])
+
+class _CudaFeatureExtractor(FeatureExtractor):
+    """faster-whisper's log-mel extractor with the STFT and mel matmul done by torch on the GPU"""
+    
+    def __init__(self, device: str = "cuda", **kwargs):
+        super().__init__(**kwargs)
+        self.device = torch.device(device)
+        # Filter bank and window live on the device for the life of the model
+        self.mel_filters_gpu = torch.from_numpy(self.mel_filters).to(self.device)
+        self.window_gpu = torch.hann_window(self.n_fft, device=self.device)
+        # Page-locked staging buffer, grown as needed and reused for every chunk
+        self._pinned = torch.empty(0, dtype=torch.float32).pin_memory()
+    
+    def _to_device(self, waveform: np.ndarray) -> torch.Tensor:
+        """Copy through pinned memory so the H2D transfer is an async DMA, not a pageable memcpy"""
+        samples = torch.from_numpy(np.asarray(waveform, dtype=np.float32))
+        if self._pinned.numel() < samples.numel():
+            self._pinned = torch.empty(samples.numel(), dtype=torch.float32).pin_memory()
+        staged = self._pinned[:samples.numel()]
+        staged.copy_(samples)
+        # Safe to reuse the buffer next call: the .cpu() at the end of __call__ syncs the stream
+        return staged.to(self.device, non_blocking=True)
+    
+    @torch.inference_mode()
+    def __call__(self, waveform: np.ndarray, padding=160, chunk_length=None):
+        if chunk_length is not None:
+            self.n_samples = chunk_length * self.sampling_rate
+            self.nb_max_frames = self.n_samples // self.hop_length
+        
+        audio = self._to_device(waveform)
+        if padding:
+            audio = torch.nn.functional.pad(audio, (0, padding))
+        
+        stft = torch.stft(audio, self.n_fft, self.hop_length, window=self.window_gpu, return_complex=True)
+        magnitudes = stft[..., :-1].abs() ** 2
+        
+        mel_spec = self.mel_filters_gpu @ magnitudes
+        log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+        log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+        log_spec = (log_spec + 4.0) / 4.0
+        
+        # CTranslate2 takes the features from host memory
+        return log_spec.cpu().numpy()
+
+class DecodedAudioCache:
+    """Process-local LRU of decoded PCM keyed by (path, size, mtime) - retries skip the decode"""
+    
+    def __init__(self, max_bytes: int, max_entries: int = 4):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+    
+    def get_or_decode(self, file_path: str) -> np.ndarray:
+        """Return the cached array for an unchanged file, else decode and remember it"""
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                return audio
+        
+        # Decode outside the lock - it is the slow part
+        audio = decode_audio(file_path, sampling_rate=SAMPLE_RATE)
+        if audio.nbytes > self.max_bytes:
+            return audio
+        
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = audio
+                self._total_bytes += audio.nbytes
+            while self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+        return audio
+
 class AudioProcessor:
+    # One inference at a time per model in this process, however many
+    # coroutines/threads are driving it - keeps VRAM use bounded
+    _whisper_gate = threading.BoundedSemaphore(1)
+    _diarization_gate = threading.BoundedSemaphore(1)
+    
     def __init__(self):
         self.whisper_model = None
+        self.batched_pipeline = None
         self.diarization_pipeline = None
+        self.diarization_stream = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self._whisper_device = torch.device(settings.whisper_device if self.device == "cuda" else "cpu")
         self.resource_manager = ResourceManager()
+        model_cache.configure_gpu_allocator()
         self.current_model_name = None
         
     async def load_models(self, model_name: str = "medium"):
         """Load Whisper and pyannote models with smart caching and resource management"""
+        # Same model already resident - nothing to check or load
+        if (self.whisper_model is not None and self.current_model_name == model_name
+                and self.diarization_pipeline is not None):
+            return
+        
         try:
             # Check resource availability and get best available model
             if not self.resource_manager.can_load_model(model_name):
@@ -37,39 +140,59 @@ class AudioProcessor:
                 print(f"Cannot load {model_name} due to resource constraints. Using {suggested_model} instead.")
                 model_name = suggested_model
             
-            # Load Whisper model using cache
+            # Load faster-whisper (CTranslate2) model from the shared model cache
             if not self.whisper_model or self.current_model_name != model_name:
-                print(f"Loading Whisper model: {model_name}")
+                compute_type = self._compute_type()
                 
-                # Get cached model with resource management
-                cached_model = model_cache.get_model(model_name)
+                # Prefer a prebuilt, already-quantized model: no load-time
+                # conversion and half the weight bytes to read from disk
+                engine_path = os.path.join(settings.whisper_engine_dir, model_name)
+                model_source = engine_path if os.path.isdir(engine_path) else model_name
+                print(f"Loading Whisper model: {model_source} ({compute_type})")
                 
-                # Move to appropriate device for processing
-                self.whisper_model = model_cache.move_to_device(cached_model, self.device)
+                self.whisper_model = WhisperModel(
+                    model_source,
+                    device=self.device,
+                    device_index=self._whisper_device.index or 0,
+                    compute_type=compute_type,
+                    cpu_threads=os.cpu_count() or 0,
+                    download_root=settings.model_cache_dir
+                )
+                if self.device == "cuda":
+                    # Log-mel on the GPU instead of numpy FFTs on one CPU core
+                    self.whisper_model.feature_extractor = _CudaFeatureExtractor(
+                        device=self._whisper_device, **self.whisper_model.feat_kwargs
+                    )
+                
+                # VAD-chunked, batched decoding on top of the same model
+                self.batched_pipeline = BatchedInferencePipeline(model=self.whisper_model)
                 self.current_model_name = model_name
             
-            # Load pyannote diarization pipeline (only once)
-            if not self.diarization_pipeline:
-                print("Loading pyannote diarization pipeline")
-                self.diarization_pipeline = Pipeline.from_pretrained(
-                    "pyannote/speaker-diarization-3.1",
-                    token=settings.hf_token  # Changed from use_auth_token to token
-                )
-                if torch.cuda.is_available():
-                    self.diarization_pipeline.to(torch.device("cuda"))
+            # pyannote pipeline is built once per worker process and shared
+            self.diarization_pipeline = await model_cache.get_diarization_pipeline()
+            if torch.cuda.is_available() and self.diarization_stream is None:
+                self.diarization_stream = torch.cuda.Stream(device=settings.diarization_device)
                     
         except Exception as e:
             raise Exception(f"Failed to load models: {str(e)}")
     
+    def _compute_type(self) -> str:
+        """CTranslate2 compute type: int8 weights, fp16 activations where Tensor Cores exist"""
+        if self.device != "cuda":
+            # int8 uses the VNNI/AVX-512 dot products; "none" keeps full fp32
+            return CPU_COMPUTE_TYPES[settings.cpu_quant]
+        major, _ = torch.cuda.get_device_capability(self._whisper_device)
+        return "int8_float16" if major >= 7 else "int8_float32"
+    
     def cleanup_gpu_memory(self):
-        """Clean up GPU memory after processing"""
-        if self.whisper_model and torch.cuda.is_available():
-            # Move model back to CPU and clear GPU cache
-            self.whisper_model = model_cache.release_gpu_memory(self.whisper_model, self.current_model_name)
-            
-        if self.diarization_pipeline and torch.cuda.is_available():
-            # Clear any remaining GPU memory
-            torch.cuda.empty_cache()
+        """Release request-scoped GPU state after processing
+        
+        Models stay on the device and the caching allocator keeps its blocks
+        (no empty_cache), so the next job starts without cudaMalloc/reload
+        stalls. Models are only offloaded when model_cache swaps one out.
+        """
+        if self.diarization_stream is not None:
+            self.diarization_stream.synchronize()
     
     async def process_audio(self, task_id: str, file_path: str, language: str = "auto", 
                           model: str = "medium", format: str = "json", 
@@ -100,18 +223,13 @@ class AudioProcessor:
                 await task_manager.update_task_progress(task_id, 20.0, 
                                                       int(estimated_processing_time * 0.7))
             
-            transcription_result = await self._transcribe_audio(task_id, file_path, language)
+            # Transcribe and (if requested) diarize - overlapped when the GPU allows
+            transcription_result, speakers_info = await self._transcribe_and_diarize(
+                task_id, file_path, language, diarization
+            )
             if task_manager:
-                await task_manager.update_task_progress(task_id, 60.0, 
-                                                      int(estimated_processing_time * 0.4))
-            
-            # Perform diarization if requested
-            speakers_info = None
-            if diarization:
-                speakers_info = await self._perform_diarization(task_id, file_path)
-                if task_manager:
-                    await task_manager.update_task_progress(task_id, 80.0, 
-                                                          int(estimated_processing_time * 0.2))
+                await task_manager.update_task_progress(task_id, 80.0, 
+                                                      int(estimated_processing_time * 0.2))
             
             # Combine results
             combined_result = await self._combine_results(
@@ -133,11 +251,7 @@ class AudioProcessor:
             # Always clean up GPU memory after processing
             self.cleanup_gpu_memory()
             # Clean up file
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except:
-                    pass  # Ignore cleanup errors
+            await asyncio.to_thread(self._remove_file, file_path)
     
     async def process_audio_sync(self, file_path: str, language: str = "auto", 
                                 model: str = "medium", format_type: str = "json", 
@@ -164,16 +278,12 @@ class AudioProcessor:
             if progress_callback:
                 progress_callback(20.0, "Transcribing audio...")
             
-            transcription_result = await self._transcribe_audio(task_id, file_path, language)
+            # Transcribe and (if requested) diarize - overlapped when the GPU allows
+            transcription_result, speakers_info = await self._transcribe_and_diarize(
+                task_id, file_path, language, diarization
+            )
             if progress_callback:
-                progress_callback(60.0, "Transcription complete, processing speakers...")
-            
-            # Perform diarization if requested
-            speakers_info = None
-            if diarization:
-                speakers_info = await self._perform_diarization(task_id, file_path)
-                if progress_callback:
-                    progress_callback(80.0, "Speaker diarization complete, formatting results...")
+                progress_callback(80.0, "Transcription and diarization complete, formatting results...")
             
             # Combine results
             combined_result = await self._combine_results(
@@ -194,96 +304,195 @@ class AudioProcessor:
             self.cleanup_gpu_memory()
 
     async def _get_file_info(self, file_path: str) -> Dict[str, Any]:
-        """Get file information using ffprobe"""
-        cmd = [
-            'ffprobe', '-v', 'quiet', '-show_format', '-show_streams',
-            '-of', 'json', file_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
+        """Get file information from the container header (PyAV, in-process)"""
+        return await asyncio.to_thread(self.read_file_info, file_path)
+    
+    @staticmethod
+    def read_file_info(file_path: str) -> Dict[str, Any]:
+        """Read duration/bitrate with libav directly - no ffprobe process, no packet decoding"""
+        with av.open(file_path) as container:
+            duration = float(container.duration) / av.time_base if container.duration else 0.0
+            bitrate = container.bit_rate or 0
         
         return {
-            'duration': float(data['format']['duration']),
-            'size': int(data['format']['size']),
-            'bitrate': int(data['format'].get('bit_rate', 0))
+            'duration': duration,
+            'size': os.path.getsize(file_path),
+            'bitrate': int(bitrate)
         }
     
-    async def _transcribe_audio(self, task_id: str, file_path: str, 
+    def _can_overlap_stages(self) -> bool:
+        """Whisper and pyannote run side by side on separate GPUs, or on one GPU with room for both"""
+        if self.device != "cuda":
+            return False
+        if self._whisper_device != torch.device(settings.diarization_device):
+            return True
+        return torch.cuda.get_device_properties(self._whisper_device).total_memory > 6 * 1024 ** 3
+    
+    async def _load_audio(self, file_path: str) -> np.ndarray:
+        """Decode the file once to 16 kHz mono float32 PCM, shared by both stages"""
+        return await asyncio.to_thread(decoded_audio_cache.get_or_decode, file_path)
+    
+    async def _transcribe_and_diarize(self, task_id: str, file_path: str, language: str,
+                                      diarization: bool):
+        """Run transcription and diarization, concurrently in worker threads when possible"""
+        audio = await self._load_audio(file_path)
+        
+        if diarization and self._can_overlap_stages():
+            # CTranslate2 and torch release the GIL, so the threads
+            # genuinely overlap on the GPU
+            return await asyncio.gather(
+                asyncio.to_thread(self._transcribe_sync, audio, language),
+                asyncio.to_thread(self._diarize_sync, audio)
+            )
+        
+        transcription_result = await self._transcribe_audio(task_id, audio, language)
+        speakers_info = None
+        if diarization:
+            speakers_info = await self._perform_diarization(task_id, audio)
+        return transcription_result, speakers_info
+    
+    async def _transcribe_audio(self, task_id: str, audio: np.ndarray, 
                               language: str) -> Dict[str, Any]:
-        """Transcribe audio using Whisper"""
+        """Transcribe audio using faster-whisper (in a thread - the event loop stays free)"""
+        return await asyncio.to_thread(self._transcribe_sync, audio, language)
+    
+    def _transcribe_sync(self, audio: np.ndarray, language: str) -> Dict[str, Any]:
+        """Transcribe audio using faster-whisper
+        
+        Speech regions found by VAD are packed into 30 s chunks and decoded
+        whisper_batch_size at a time, instead of one window after another.
+        """
         language_param = None if language == "auto" else language
         
-        result = self.whisper_model.transcribe(
-            file_path,
-            language=language_param,
-            verbose=False
-        )
+        with self._whisper_gate:
+            segments, info = self.batched_pipeline.transcribe(
+                audio,
+                language=language_param,
+                beam_size=5,
+                batch_size=settings.whisper_batch_size
+            )
+            
+            # segments is a lazy generator - decoding happens while it is consumed
+            segments = [
+                {"id": i, "start": s.start, "end": s.end, "text": s.text}
+                for i, s in enumerate(segments)
+            ]
         
-        return result
+        return {
+            "text": "".join(s["text"] for s in segments),
+            "language": info.language,
+            "segments": segments
+        }
     
-    async def _perform_diarization(self, task_id: str, file_path: str) -> Dict[str, Any]:
-        """Perform speaker diarization using pyannote"""
+    async def _perform_diarization(self, task_id: str, audio: np.ndarray) -> np.ndarray:
+        """Perform speaker diarization using pyannote (in a thread - the event loop stays free)"""
+        return await asyncio.to_thread(self._diarize_sync, audio)
+    
+    def _diarize_sync(self, audio: np.ndarray) -> np.ndarray:
+        """Perform speaker diarization using pyannote, returning a TURN_DTYPE array"""
         try:
-            # pyannote 3.1 returns a DiarizeOutput object
-            output = self.diarization_pipeline(file_path)
+            # In-memory input: pyannote skips its own decode of the file
+            waveform = {"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": SAMPLE_RATE}
+            
+            # pyannote 3.1 returns a DiarizeOutput object; no autograd bookkeeping needed
+            with self._diarization_gate, torch.inference_mode():
+                if self.diarization_stream is not None:
+                    # Own CUDA stream so its kernels interleave with Whisper's
+                    with torch.cuda.stream(self.diarization_stream):
+                        output = self.diarization_pipeline(waveform)
+                    self.diarization_stream.synchronize()
+                else:
+                    output = self.diarization_pipeline(waveform)
             
             # The diarization is in output.speaker_diarization (an Annotation object)
             diarization = output.speaker_diarization
             
-            speakers = {}
-            # Iterate over the annotation: (segment, track, label) tuples
-            for turn, track, speaker in diarization.itertracks(yield_label=True):
-                speaker_id = f"SPEAKER_{speaker}"
-                if speaker_id not in speakers:
-                    speakers[speaker_id] = []
-                
-                speakers[speaker_id].append({
-                    "start": float(turn.start),
-                    "end": float(turn.end),
-                    "duration": float(turn.end - turn.start)
-                })
-            
-            return speakers
+            # Annotation iterates (segment, track, label) tuples in time order
+            return np.array(
+                [(turn.start, turn.end, speaker) for turn, _, speaker in diarization.itertracks(yield_label=True)],
+                dtype=TURN_DTYPE
+            )
             
         except Exception as e:
             print(f"Diarization failed: {e}")
             import traceback
             print(traceback.format_exc())
-            return {}
+            return np.empty(0, dtype=TURN_DTYPE)
+    
+    @staticmethod
+    def _remove_file(file_path: str):
+        """Delete a processed file, ignoring cleanup errors"""
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
     
     async def _combine_results(self, transcription: Dict[str, Any], 
-                             speakers: Optional[Dict[str, Any]], 
+                             turns: Optional[np.ndarray], 
                              duration: float) -> Dict[str, Any]:
+        """Combine transcription and diarization results (off the event loop)"""
+        return await asyncio.to_thread(self._combine_results_sync, transcription, turns, duration)
+    
+    def _combine_results_sync(self, transcription: Dict[str, Any], 
+                              turns: Optional[np.ndarray], 
+                              duration: float) -> Dict[str, Any]:
         """Combine transcription and diarization results"""
         segments = transcription.get('segments', [])
         
-        if speakers:
+        if turns is not None and len(turns) and segments:
             # Map speakers to segments based on timing
-            for segment in segments:
-                segment['speaker'] = self._find_speaker_for_segment(
-                    segment, speakers
-                )
+            for segment, speaker in zip(segments, self._assign_speakers(segments, turns)):
+                segment['speaker'] = speaker
         
         return {
             'text': transcription.get('text', ''),
             'language': transcription.get('language', 'unknown'),
             'segments': segments,
-            'speakers': speakers,
+            'speakers': self._speakers_dict(turns) if turns is not None else None,
             'duration': duration,
             'word_count': len(transcription.get('text', '').split()),
         }
     
-    def _find_speaker_for_segment(self, segment: Dict[str, Any], 
-                                speakers: Dict[str, Any]) -> str:
-        """Find the most likely speaker for a segment"""
-        segment_start = segment.get('start', 0)
-        segment_end = segment.get('end', 0)
-        segment_mid = (segment_start + segment_end) / 2
+    @staticmethod
+    def _speakers_dict(turns: np.ndarray) -> Dict[str, List[Dict[str, float]]]:
+        """Per-speaker turn lists for the stored result, speakers in order of first appearance"""
+        labels, first_seen = np.unique(turns["speaker"], return_index=True)
+        speakers = {}
+        for label in labels[np.argsort(first_seen)]:
+            mask = turns["speaker"] == label
+            starts, ends = turns["start"][mask], turns["end"][mask]
+            speakers[f"SPEAKER_{label}"] = [
+                {"start": start, "end": end, "duration": length}
+                for start, end, length in zip(starts.tolist(), ends.tolist(), (ends - starts).tolist())
+            ]
+        return speakers
+    
+    @staticmethod
+    def _assign_speakers(segments: List[Dict[str, Any]], turns: np.ndarray) -> List[str]:
+        """Speaker whose turn contains each segment's midpoint, via one sorted-array search"""
+        if not len(turns):
+            return ["SPEAKER_UNKNOWN"] * len(segments)
+        
+        order = np.argsort(turns["start"], kind='stable')
+        starts, ends = turns["start"][order], turns["end"][order]
+        labels = np.char.add("SPEAKER_", turns["speaker"][order])
         
-        for speaker_id, turns in speakers.items():
-            for turn in turns:
-                if turn['start'] <= segment_mid <= turn['end']:
-                    return speaker_id
+        # For each turn, the index of the longest-reaching turn started so far -
+        # catches a long turn that still covers the midpoint after a shorter one ended
+        is_record = ends == np.maximum.accumulate(ends)
+        cover = np.maximum.accumulate(np.where(is_record, np.arange(len(ends)), 0))
         
-        return "SPEAKER_UNKNOWN"
\ No newline at end of file
+        mids = np.fromiter(
+            ((seg.get('start', 0) + seg.get('end', 0)) / 2 for seg in segments),
+            dtype=np.float64, count=len(segments)
+        )
+        idx = np.searchsorted(starts, mids, side='right') - 1
+        found = idx >= 0
+        idx = np.maximum(idx, 0)
+        idx = np.where(ends[idx] >= mids, idx, cover[idx])
+        found &= ends[idx] >= mids
+        
+        return np.where(found, labels[idx], "SPEAKER_UNKNOWN").tolist()
+
+# Decoded audio shared by every AudioProcessor in this process
+decoded_audio_cache = DecodedAudioCache(settings.decoded_audio_cache_mb * 1024 * 1024)
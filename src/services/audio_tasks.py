@@ -3,10 +3,16 @@ RQ task functions for audio processing - FULLY SYNCHRONOUS
 No async/await at all - pure synchronous code for RQ workers
 """
 import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any
-from .audio_processor import AudioProcessor
-from .result_service import result_service
+from typing import IO, Dict, Any, List, Tuple, Union
+import numpy as np
+import orjson
+from .audio_utils import load_audio_16k_mono, read_duration
+from .result_service import result_etag, result_service
 from .storage_service import storage_service
 
 try:
@@ -22,6 +28,22 @@ except ImportError:
 
 logger = get_logger("audio_tasks")
 
+# Clips up to one Whisper window long are batched across tasks in one decoder pass
+SHORT_CLIP_SECONDS = 30
+
+# Columns a finished task overwrites on the row created when it was queued
+RESULT_COLUMNS = (
+    "transcription_text", "formatted_result", "status", "processing_time_seconds",
+    "detected_language", "word_count", "started_at", "completed_at"
+)
+
+# MinIO downloads are copied in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Loaded faster-whisper models, kept for the life of the worker process: (model, device) -> model
+_MODEL_CACHE: Dict[Tuple[str, str], Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
 
 def update_progress(task_id: str, progress: float, message: str, status: str = "processing") -> None:
     """Sync progress update - always includes status to prevent data loss"""
@@ -48,6 +70,222 @@ def update_progress(task_id: str, progress: float, message: str, status: str = "
         logger.error(f"Progress update failed for {task_id}: {e}")
 
 
+def get_or_load_model(model: str, device: str, model_cache_dir: str):
+    """Return the worker's loaded faster-whisper model, loading it from the shared volume on first use"""
+    key = (model, device)
+    whisper_model = _MODEL_CACHE.get(key)
+    if whisper_model is not None:
+        return whisper_model
+    
+    with _MODEL_CACHE_LOCK:
+        whisper_model = _MODEL_CACHE.get(key)
+        if whisper_model is None:
+            from faster_whisper import WhisperModel
+            from .audio_processor import CPU_COMPUTE_TYPES
+            
+            # fp16 on GPU; int8 (or settings.cpu_quant) on CPU
+            compute_type = "float16" if device == "cuda" else CPU_COMPUTE_TYPES[settings.cpu_quant]
+            
+            # Prebuilt CTranslate2 model if scripts/build_ct2_whisper.sh made one
+            engine_path = os.path.join(settings.whisper_engine_dir, model)
+            model_source = engine_path if os.path.isdir(engine_path) else model
+            
+            logger.info(f"Loading model '{model_source}' ({compute_type}) from cache: {model_cache_dir}")
+            whisper_model = WhisperModel(
+                model_source,
+                device=device,
+                compute_type=compute_type,
+                download_root=model_cache_dir  # Use pre-downloaded models from shared volume
+            )
+            _MODEL_CACHE[key] = whisper_model
+        return whisper_model
+
+
+def _transcribe_batched(whisper_model, audio: np.ndarray, language: str, batch_size: int):
+    """VAD-chunked batched transcription, halving the batch on CUDA out-of-memory"""
+    from faster_whisper import BatchedInferencePipeline
+    
+    pipeline = BatchedInferencePipeline(model=whisper_model)
+    while True:
+        try:
+            segments, info = pipeline.transcribe(
+                audio,
+                language=None if language == "auto" else language,
+                beam_size=5,
+                batch_size=batch_size
+            )
+            # segments is a lazy generator - decoding (and any OOM) happens while it is consumed
+            segments = [
+                {"id": i, "start": s.start, "end": s.end, "text": s.text}
+                for i, s in enumerate(segments)
+            ]
+            return segments, info
+        except RuntimeError as e:
+            if "out of memory" not in str(e).lower() or batch_size <= 1:
+                raise
+            batch_size //= 2
+            logger.warning(f"CUDA out of memory, retrying with batch_size={batch_size}")
+
+
+def _object_key(storage_path: str) -> str:
+    """MinIO object key for a storage path ("s3://bucket/uploads/f.wav" or "uploads/f.wav")"""
+    if storage_path.startswith("s3://"):
+        # ["s3:", "", bucket, key]
+        parts = storage_path.split("/", 3)
+        if len(parts) == 4:
+            return parts[3]
+    return storage_path
+
+
+def _minio_client():
+    """The shared MinIO client, or None when files live on the local filesystem"""
+    return storage_service.minio_client if storage_service.use_minio else None
+
+
+def _download_audio(file_path: str, storage_path: str, progress, object_key: str = None,
+                    minio=None) -> Union[str, IO[bytes]]:
+    """Fetch the uploaded file (MinIO) or resolve its local path
+    
+    MinIO objects are streamed into a SpooledTemporaryFile that libav decodes
+    from: up to settings.minio_memory_download_mb it stays in RAM (no disk
+    round-trip), larger uploads spill to a temp file instead of worker memory.
+    """
+    local_file_path = file_path
+    if storage_path:
+        progress(5, "Downloading file...")
+        
+        # Direct synchronous MinIO download
+        minio = minio or _minio_client()
+        if minio:
+            response = minio.get_object(
+                settings.minio_bucket_name,
+                object_key or _object_key(storage_path)  # Use extracted object key, not full URI
+            )
+            # max_size=0 would mean "never spill" - a 0 MB setting keeps nothing in RAM instead
+            audio_file = tempfile.SpooledTemporaryFile(max_size=max(settings.minio_memory_download_mb * 1024 * 1024, 1))
+            try:
+                shutil.copyfileobj(response, audio_file, DOWNLOAD_CHUNK_SIZE)
+            except Exception:
+                audio_file.close()
+                raise
+            finally:
+                response.close()
+                response.release_conn()
+            
+            logger.info(f"Downloaded: {storage_path} ({audio_file.tell()} bytes)")
+            return audio_file
+        
+        # Local filesystem - just use the path
+        local_file_path = storage_service.local_path(storage_path)
+    
+    # Check file exists
+    if not os.path.exists(local_file_path):
+        raise Exception(f"File not found: {local_file_path}")
+    
+    return local_file_path
+
+
+def _close_download(audio_file: Union[str, IO[bytes], None]) -> None:
+    """Release a spooled MinIO download (RAM or its temp file); local paths are left alone"""
+    if audio_file is not None and not isinstance(audio_file, str):
+        audio_file.close()
+
+
+def _transcribe_short_clips(whisper_model, audio_files: List[Union[str, IO[bytes]]],
+                            language: str) -> List[Dict[str, Any]]:
+    """Transcribe clips of at most 30 s in a single batched encoder/decoder pass
+    
+    Each clip is one padded 30 s window, so the whole group costs one
+    encode and one generate call instead of one pipeline run per file.
+    """
+    from faster_whisper.audio import pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
+    
+    sampling_rate = whisper_model.feature_extractor.sampling_rate
+    audios = [load_audio_16k_mono(audio_file) for audio_file in audio_files]
+    features = np.stack([pad_or_trim(whisper_model.feature_extractor(audio)) for audio in audios])
+    encoder_output = whisper_model.encode(features)
+    
+    if not whisper_model.model.is_multilingual:
+        languages = ["en"] * len(audios)
+    elif language == "auto":
+        # Best language token per clip, e.g. "<|en|>" -> "en"
+        languages = [probs[0][0][2:-2] for probs in whisper_model.model.detect_language(encoder_output)]
+    else:
+        languages = [language] * len(audios)
+    
+    tokenizers = [
+        Tokenizer(whisper_model.hf_tokenizer, whisper_model.model.is_multilingual,
+                  task="transcribe", language=lang)
+        for lang in languages
+    ]
+    prompts = [whisper_model.get_prompt(tokenizer, [], without_timestamps=True) for tokenizer in tokenizers]
+    results = whisper_model.model.generate(
+        encoder_output, prompts, beam_size=5, max_length=448, suppress_blank=True
+    )
+    
+    transcripts = []
+    for audio, lang, tokenizer, result in zip(audios, languages, tokenizers, results):
+        text = tokenizer.decode(result.sequences_ids[0])
+        segments = [{"id": 0, "start": 0.0, "end": len(audio) / sampling_rate, "text": text}] if text.strip() else []
+        transcripts.append({"segments": segments, "language": lang})
+    return transcripts
+
+
+def _save_results(rows: List[Dict[str, Any]]) -> None:
+    """Upsert completed transcription rows in a single INSERT ... ON CONFLICT
+    
+    The API inserts the row when the task is queued, so results update it in
+    place; a multi-row list goes out as one executemany. Failures are logged -
+    the result is still served from the Redis cache.
+    """
+    try:
+        from sqlalchemy.dialects.postgresql import insert
+        try:
+            from ..models import TranscriptionResult
+        except ImportError:
+            from models import TranscriptionResult
+        
+        # Import db_service at module level to ensure same instance
+        from services.database_service import db_service
+        
+        # Re-initialize if needed (idempotent)
+        if not db_service._initialized:
+            print("⚠️  Database not initialized in task, initializing now...")
+            db_service.initialize()
+        
+        table = TranscriptionResult.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.task_id],
+            set_={column: stmt.excluded[column] for column in RESULT_COLUMNS}
+        )
+        
+        with db_service.get_session() as session:
+            session.execute(stmt, rows)
+            session.commit()
+        print(f"✅ Database save successful ({len(rows)} row(s))")
+        logger.info(f"✅ Saved {len(rows)} transcription result(s) to database")
+        
+    except Exception as db_error:
+        print(f"❌ Database save failed: {db_error}")
+        import traceback
+        traceback.print_exc()
+        logger.error(f"Failed to save to database: {db_error}")
+
+
+def _load_whisper_model(model: str):
+    """Whisper model for this worker's device (cached across tasks)"""
+    import torch
+    
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    
+    # Use MODEL_CACHE_DIR from environment (mounted shared volume)
+    model_cache_dir = os.getenv("MODEL_CACHE_DIR", "/models")
+    
+    return get_or_load_model(model, device, model_cache_dir)
+
+
 def process_transcription_task(
     file_path: str,
     storage_path: str = None,
@@ -57,18 +295,28 @@ def process_transcription_task(
     diarization: bool = True,
     original_filename: str = None,
     api_token: str = None,
+    needs_conversion: bool = False,
+    task_id: str = None,
+    whisper_model: Any = None,
+    prefetched_audio: Union[str, IO[bytes], None] = None,
+    decoded_audio: np.ndarray = None,
+    transcript: Dict[str, Any] = None,
+    db_rows: List[Dict[str, Any]] = None,
     **kwargs
 ) -> Dict[str, Any]:
     """
     RQ task - FULLY SYNCHRONOUS, no async/await
     Just plain Python code that RQ workers can execute directly
+    
+    task_id, whisper_model, prefetched_audio, decoded_audio, transcript and
+    db_rows are passed by process_transcription_batch; a standalone job uses
+    its own RQ job id, downloads the file, loads the model, transcribes and
+    saves its database row by itself.
     """
     from rq import get_current_job
-    import whisper
-    import torch
     
-    job = get_current_job()
-    task_id = job.id
+    if task_id is None:
+        task_id = get_current_job().id
     start_time = datetime.now(timezone.utc)
     
     print("=" * 80)
@@ -82,75 +330,49 @@ def process_transcription_task(
         print(f"   📊 Progress: {percent}% - {msg}")
         update_progress(task_id, percent, msg, status="processing")
     
+    local_file_path = file_path
+    audio_file = None
+    # Resolved once, shared by the download and the storage cleanup below
+    object_key = _object_key(storage_path) if storage_path else None
+    minio = _minio_client()
     try:
         print("🔄 Setting initial progress...")
         progress(0, "Starting...")
         
-        # Download file if needed - using MinIO sync client
-        local_file_path = file_path
-        if storage_path:
-            progress(5, "Downloading file...")
+        # Download file if needed (already done when the batch prefetched it)
+        audio_file = prefetched_audio
+        if audio_file is None:
+            audio_file = _download_audio(file_path, storage_path, progress, object_key, minio)
+        # Only a local path is left on disk to clean up - MinIO downloads are
+        # spooled files, removed when closed
+        local_file_path = audio_file if isinstance(audio_file, str) else None
+        
+        if transcript is None:
+            # Decode once, in-process, to 16kHz mono float32 - no temp WAV on disk
+            progress(8, "Decoding audio...")
+            audio = decoded_audio if decoded_audio is not None else load_audio_16k_mono(audio_file)
             
-            # Direct synchronous MinIO download
-            if storage_service.use_minio and storage_service.minio_client:
-                import tempfile
-                
-                # Extract object key from S3 URI if needed
-                # storage_path could be: "s3://bucket/uploads/file.wav" or just "uploads/file.wav"
-                object_key = storage_path
-                if storage_path.startswith("s3://"):
-                    # Remove "s3://bucket-name/" prefix to get just the object key
-                    parts = storage_path.replace("s3://", "").split("/", 1)
-                    if len(parts) > 1:
-                        object_key = parts[1]  # Get everything after bucket name
-                
-                local_file_path = os.path.join(tempfile.gettempdir(), os.path.basename(object_key))
-                storage_service.minio_client.fget_object(
-                    settings.minio_bucket_name,
-                    object_key,  # Use extracted object key, not full URI
-                    local_file_path
-                )
-            else:
-                # Local filesystem - just use the path
-                local_file_path = os.path.join(storage_service.local_upload_dir, storage_path)
+            progress(10, "Loading model...")
             
-            logger.info(f"Downloaded: {storage_path}")
-        
-        # Check file exists
-        if not os.path.exists(local_file_path):
-            raise Exception(f"File not found: {local_file_path}")
-        
-        progress(10, "Loading model...")
-        
-        # Load Whisper model from shared volume cache
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        
-        # Use MODEL_CACHE_DIR from environment (mounted shared volume)
-        model_cache_dir = os.getenv("MODEL_CACHE_DIR", "/models")
-        
-        logger.info(f"Loading model '{model}' from cache: {model_cache_dir}")
-        whisper_model = whisper.load_model(
-            model, 
-            device=device,
-            download_root=model_cache_dir  # Use pre-downloaded models from shared volume
-        )
-        
-        progress(20, "Transcribing audio...")
-        
-        # Transcribe synchronously
-        result = whisper_model.transcribe(
-            local_file_path,
-            language=None if language == "auto" else language,
-            verbose=False
-        )
+            if whisper_model is None:
+                whisper_model = _load_whisper_model(model)
+            
+            progress(20, "Transcribing audio...")
+            
+            # Transcribe synchronously, 30 s speech chunks decoded batch_size at a time
+            batch_size = settings.whisper_batch_size if whisper_model.model.device == "cuda" else settings.whisper_cpu_batch_size
+            segments, info = _transcribe_batched(whisper_model, audio, language, batch_size)
+            del audio  # free the PCM buffer before results are saved
+            transcript = {"segments": segments, "language": info.language}
         
         progress(90, "Processing results...")
         
         # Format result
+        segments = transcript["segments"]
         formatted_result = {
-            "text": result.get("text", ""),
-            "segments": result.get("segments", []),
-            "language": result.get("language", "unknown")
+            "text": "".join(s["text"] for s in segments),
+            "segments": segments,
+            "language": transcript["language"] or "unknown"
         }
         
         progress(95, "Saving results...")
@@ -164,71 +386,54 @@ def process_transcription_task(
             'original_filename': original_filename
         }
         
-        # Direct database insert (synchronous)
-        try:
-            try:
-                from ..models import TranscriptionResult
-            except ImportError:
-                from models import TranscriptionResult
-            
-            # Import db_service at module level to ensure same instance
-            from services.database_service import db_service
-            
-            # Re-initialize if needed (idempotent)
-            if not db_service._initialized:
-                print("⚠️  Database not initialized in task, initializing now...")
-                db_service.initialize()
-            
+        # Direct database upsert (synchronous) - one statement, no ORM unit of work
+        row = {
+            "task_id": task_id,
+            "api_token": api_token or "unknown",
+            "original_filename": original_filename,
+            "language": language,
+            "model": model,
+            "format_type": format_type,
+            "diarization_enabled": diarization,
+            "transcription_text": formatted_result["text"],
+            "formatted_result": formatted_result,
+            "status": "completed",
+            "processing_time_seconds": metadata['processing_time_seconds'],
+            "detected_language": formatted_result.get("language", "unknown"),
+            "word_count": len(formatted_result["text"].split()) if formatted_result["text"] else 0,
+            "started_at": start_time,
+            "completed_at": end_time
+        }
+        if db_rows is not None:
+            # Batched job - process_transcription_batch writes all rows at once
+            db_rows.append(row)
+        else:
             print(f"💾 Saving to database: task_id={task_id}")
-            
-            db_result = TranscriptionResult(
-                task_id=task_id,
-                api_token=api_token or "unknown",
-                transcription_text=formatted_result["text"],
-                formatted_result=formatted_result,  # Correct column name
-                status="completed",
-                processing_time_seconds=metadata['processing_time_seconds'],
-                original_filename=original_filename,
-                detected_language=formatted_result.get("language", "unknown"),
-                word_count=len(formatted_result["text"].split()) if formatted_result["text"] else 0,
-                started_at=start_time,
-                completed_at=end_time
-            )
-            
-            with db_service.get_session() as session:
-                session.add(db_result)
-                session.commit()
-                print(f"✅ Database save successful")
-                logger.info(f"✅ Saved transcription result to database")
-                
-        except Exception as db_error:
-            print(f"❌ Database save failed: {db_error}")
-            import traceback
-            traceback.print_exc()
-            logger.error(f"Failed to save to database: {db_error}")
+            _save_results([row])
         
         # Update Redis cache with JSON
-        import json
         redis_client = get_redis_client()
         
+        # Cache the result and mark the task completed in one round-trip
         print(f"💾 Caching result in Redis: transcription_result:{task_id}")
-        redis_client.setex(
-            f"transcription_result:{task_id}",
-            3600 * 24,  # 24 hours
-            json.dumps(formatted_result)  # Store as JSON string, not Python str
-        )
-        
-        # Update task status to completed
         print(f"✅ Setting final status to COMPLETED for task {task_id}")
-        redis_client.hset(f"task:{task_id}", mapping={
-            "status": "completed",
-            "progress": 100,
-            "message": "Transcription completed successfully",
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        })
-        
-        # Set expiration on task hash (24 hours)
-        redis_client.expire(f"task:{task_id}", 86400)
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.setex(
+                f"transcription_result:{task_id}",
+                3600 * 24,  # 24 hours
+                orjson.dumps(formatted_result, option=orjson.OPT_SERIALIZE_NUMPY)  # JSON bytes, stored as-is
+            )
+            # Hashed once here; GET /result serves it as the ETag
+            pipe.setex(f"transcription_result:{task_id}:etag", 3600 * 24, result_etag(task_id, formatted_result))
+            pipe.hset(f"task:{task_id}", mapping={
+                "status": "completed",
+                "progress": 100,
+                "message": "Transcription completed successfully",
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            })
+            # Set expiration on task hash (24 hours)
+            pipe.expire(f"task:{task_id}", 86400)
+            pipe.execute()
         
         print("=" * 80)
         print(f"✅ WORKER COMPLETED: task_id={task_id}")
@@ -239,24 +444,18 @@ def process_transcription_task(
         # Don't call progress() here - status is already set to "completed" above!
         
         # Cleanup local file
+        _close_download(audio_file)
         try:
-            if storage_path and local_file_path and os.path.exists(local_file_path):
+            if (storage_path or needs_conversion) and local_file_path and os.path.exists(local_file_path):
                 os.remove(local_file_path)
                 logger.info(f"Cleaned up: {local_file_path}")
         except Exception as e:
             logger.warning(f"Cleanup failed: {e}")
         
         # Cleanup storage synchronously
-        if storage_path and storage_service.use_minio and storage_service.minio_client:
+        if storage_path and minio:
             try:
-                # Extract object key from S3 URI if needed
-                object_key = storage_path
-                if storage_path.startswith("s3://"):
-                    parts = storage_path.replace("s3://", "").split("/", 1)
-                    if len(parts) > 1:
-                        object_key = parts[1]
-                
-                storage_service.minio_client.remove_object(
+                minio.remove_object(
                     settings.minio_bucket_name,
                     object_key  # Use extracted object key, not full URI
                 )
@@ -281,10 +480,150 @@ def process_transcription_task(
         logger.error(f"{error_msg}\n{error_trace}")
         
         # Cleanup on error
+        _close_download(audio_file)
         try:
             if local_file_path and os.path.exists(local_file_path):
                 os.remove(local_file_path)
         except:
             pass
         
-        raise Exception(error_msg)
\ No newline at end of file
+        raise Exception(error_msg)
+
+
+def _is_canceled(task_id: str) -> bool:
+    """True if the task was canceled while it waited in a batch"""
+    try:
+        return get_redis_client().hget(f"task:{task_id}", "status") == "canceled"
+    except Exception as e:
+        logger.warning(f"Could not read status of {task_id}: {e}")
+        return False
+
+
+def _fetch_and_decode(job_params: Dict[str, Any], audio_file: Union[str, IO[bytes], None] = None):
+    """
+    Download (unless already prefetched) and decode one batched upload.
+    Returns (download, pcm); the download is closed once decoded, pcm is None
+    if decoding failed so the task retries it and reports the error.
+    """
+    task_id = job_params["task_id"]
+    if audio_file is None:
+        audio_file = _download_audio(
+            job_params["file_path"], job_params.get("storage_path"),
+            lambda percent, msg: update_progress(task_id, percent, msg)
+        )
+    try:
+        audio = load_audio_16k_mono(audio_file)
+    except Exception as e:
+        logger.warning(f"Background decode failed for {task_id}: {e}")
+        return audio_file, None
+    _close_download(audio_file)
+    return audio_file, audio
+
+
+def process_transcription_batch(jobs: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    RQ task for a group of compatible requests built by src/rq_batcher.py
+    
+    All jobs share model/language/diarization, so the model is loaded once
+    and reused for every request in the batch. A failing request is marked
+    failed on its own and does not abort the rest of the batch; requests
+    canceled while waiting are skipped.
+    """
+    outcomes = {job_params["task_id"]: "canceled" for job_params in jobs if _is_canceled(job_params["task_id"])}
+    jobs = [job_params for job_params in jobs if job_params["task_id"] not in outcomes]
+    if not jobs:
+        print("📦 BATCH SKIPPED: every task was canceled")
+        return outcomes
+    
+    print(f"📦 BATCH STARTED: {len(jobs)} task(s), model={jobs[0].get('model')}")
+    whisper_model = _load_whisper_model(jobs[0].get("model", "medium"))
+    
+    # Only clips short enough to share one decoder pass are fetched up front;
+    # the router's probed duration spares downloading long files just to check.
+    # Anything that fails here is retried (and reported) by its own task run.
+    short_clips = {}
+    for job_params in jobs:
+        task_id = job_params["task_id"]
+        duration = job_params.get("audio_duration_seconds")
+        if duration is not None and duration > SHORT_CLIP_SECONDS:
+            continue
+        try:
+            audio_file = _download_audio(
+                job_params["file_path"], job_params.get("storage_path"),
+                lambda percent, msg, task_id=task_id: update_progress(task_id, percent, msg)
+            )
+            if read_duration(audio_file) <= SHORT_CLIP_SECONDS:
+                short_clips[task_id] = audio_file
+            else:
+                _close_download(audio_file)
+        except Exception as e:
+            logger.warning(f"Batch prefetch failed for {task_id}: {e}")
+    
+    transcripts = {}
+    if len(short_clips) > 1:
+        try:
+            transcripts = dict(zip(
+                short_clips,
+                _transcribe_short_clips(whisper_model, list(short_clips.values()), jobs[0].get("language", "auto"))
+            ))
+            print(f"📦 Transcribed {len(transcripts)} short clip(s) in one batch")
+        except Exception as e:
+            logger.warning(f"Batched short-clip decode failed, transcribing one by one: {e}")
+    
+    # Batch-transcribed clips are done with their audio; the closed download is
+    # still handed to the task so it does not fetch the file again
+    for task_id in transcripts:
+        _close_download(short_clips[task_id])
+    
+    # Fetch and decode the next file on a CPU thread while the current one is on
+    # the GPU. Only one file ahead, and each download is closed once decoded, so
+    # besides the short clips at most two PCM buffers and one download are held.
+    pending_decodes = iter([job_params for job_params in jobs if job_params["task_id"] not in transcripts])
+    decodes = {}
+    
+    db_rows = []
+    with ThreadPoolExecutor(max_workers=1) as decoder:
+        def decode_next():
+            next_job = next(pending_decodes, None)
+            if next_job is not None:
+                next_task_id = next_job["task_id"]
+                decodes[next_task_id] = decoder.submit(_fetch_and_decode, next_job, short_clips.pop(next_task_id, None))
+        
+        decode_next()
+        for job_params in jobs:
+            task_id = job_params["task_id"]
+            audio_file = short_clips.pop(task_id, None)
+            decoded_audio = None
+            decode = decodes.pop(task_id, None)
+            if decode is not None:
+                decode_next()
+            if _is_canceled(task_id):
+                outcomes[task_id] = "canceled"
+                continue
+            if decode is not None:
+                try:
+                    audio_file, decoded_audio = decode.result()
+                except Exception as e:
+                    # The task retries the download itself and reports the error
+                    logger.warning(f"Background fetch failed for {task_id}: {e}")
+            try:
+                process_transcription_task(
+                    **job_params,
+                    whisper_model=whisper_model,
+                    prefetched_audio=audio_file,
+                    decoded_audio=decoded_audio,
+                    transcript=transcripts.get(task_id),
+                    db_rows=db_rows
+                )
+                outcomes[job_params["task_id"]] = "completed"
+            except Exception as e:
+                # Already recorded as failed in Redis by process_transcription_task
+                logger.error(f"Batched task {job_params['task_id']} failed: {e}")
+                outcomes[job_params["task_id"]] = "failed"
+            audio_file = decoded_audio = None
+    
+    if db_rows:
+        _save_results(db_rows)
+    
+    print(f"📦 BATCH FINISHED: {outcomes}")
+    return outcomes
@@ -1,122 +1,127 @@
-import subprocess
-import json
+import asyncio
 import os
 import tempfile
-from pathlib import Path
-from typing import Optional
+from typing import IO, Optional, Union
+import av
+import numpy as np
+
+# Decoding/resampling is CPU-bound - never run more conversions than there are cores
+_decode_sem = asyncio.Semaphore(os.cpu_count() or 1)
+
+def _rewind(source: Union[str, IO[bytes]]) -> Union[str, IO[bytes]]:
+    """In-memory sources are read from their current position - start each open at 0"""
+    if not isinstance(source, str):
+        source.seek(0)
+    return source
+
+def read_duration(source: Union[str, IO[bytes]]) -> float:
+    """Duration in seconds from the container header (libav, no decoding)"""
+    with av.open(_rewind(source), "r") as container:
+        if container.duration is not None:
+            return float(container.duration) / av.time_base
+        # Some containers only carry a per-stream duration
+        stream = container.streams.audio[0]
+        return float(stream.duration * stream.time_base)
 
 async def get_audio_duration(file_path: str) -> float:
-    """Get audio duration in seconds using ffprobe"""
+    """Get audio duration in seconds with libav (in-process)"""
     try:
-        cmd = [
-            'ffprobe', 
-            '-v', 'quiet', 
-            '-show_entries', 'format=duration', 
-            '-of', 'json', 
-            file_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
-        
-        duration = float(data['format']['duration'])
-        return duration
-        
-    except (subprocess.CalledProcessError, KeyError, ValueError, json.JSONDecodeError) as e:
+        return await asyncio.to_thread(read_duration, file_path)
+    except (av.FFmpegError, IndexError, TypeError) as e:
         raise Exception(f"Could not determine audio duration: {str(e)}")
 
+async def probe_duration(file_path: str) -> float:
+    """Read duration from the container header - no decoding"""
+    return await get_audio_duration(file_path)
+
+def _has_audio_stream(file_path: str) -> bool:
+    """True when libav can open the file and it has at least one audio stream"""
+    with av.open(file_path) as container:
+        return any(stream.type == 'audio' for stream in container.streams)
+
 async def validate_audio_file(file_path: str) -> bool:
     """Validate that the file is a valid audio/video file"""
     try:
         if not os.path.exists(file_path):
             return False
-            
-        cmd = [
-            'ffprobe', 
-            '-v', 'quiet', 
-            '-show_entries', 'stream=codec_type', 
-            '-of', 'json', 
-            file_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
-        
-        # Check if file has audio stream
-        streams = data.get('streams', [])
-        has_audio = any(stream.get('codec_type') == 'audio' for stream in streams)
-        
-        return has_audio
+        return await asyncio.to_thread(_has_audio_stream, file_path)
         
     except Exception:
         return False
 
-async def convert_audio_to_wav_16khz(file_path: str) -> str:
+def _write_wav_16khz(file_path: str, output_path: str):
+    """Decode the first audio stream and write it as 16kHz PCM s16 mono WAV"""
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=16000)
+    with av.open(file_path) as source, av.open(output_path, 'w', format='wav') as output:
+        out_stream = output.add_stream('pcm_s16le', rate=16000, layout='mono')
+        
+        def write(frame):
+            # frame=None flushes the resampler
+            for resampled in resampler.resample(frame):
+                output.mux(out_stream.encode(resampled))
+        
+        for frame in source.decode(source.streams.audio[0]):
+            frame.pts = None  # let the resampler/encoder assign contiguous timestamps
+            write(frame)
+        write(None)
+        output.mux(out_stream.encode(None))
+
+def load_audio_16k_mono(file: Union[str, IO[bytes]]) -> np.ndarray:
+    """Decode the first audio stream of a path or in-memory file to 16kHz mono float32 samples in [-1, 1]"""
+    resampler = av.AudioResampler(format='flt', layout='mono', rate=16000)
+    chunks = []
+    with av.open(_rewind(file), "r") as source:
+        for frame in source.decode(source.streams.audio[0]):
+            frame.pts = None
+            chunks.extend(resampled.to_ndarray() for resampled in resampler.resample(frame))
+        chunks.extend(resampled.to_ndarray() for resampled in resampler.resample(None))
+    
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    # Packed mono frames are (1, samples) each
+    return np.concatenate(chunks, axis=1).reshape(-1)
+
+def _temp_wav_path() -> str:
+    fd, output_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)  # Close the file descriptor
+    return output_path
+
+async def convert_audio_to_wav_16khz(file_path: str, output_path: Optional[str] = None) -> str:
     """Convert audio to 16kHz WAV PCM mono for Whisper processing"""
     try:
-        # Create temporary output file
-        fd, output_path = tempfile.mkstemp(suffix=".wav")
-        os.close(fd)  # Close the file descriptor
+        if output_path is None:
+            # Create temporary output file
+            output_path = _temp_wav_path()
         
-        cmd = [
-            'ffmpeg', 
-            '-i', file_path,
-            '-acodec', 'pcm_s16le',  # PCM 16-bit
-            '-ac', '1',              # mono
-            '-ar', '16000',          # 16kHz sample rate
-            '-y',                    # Overwrite output file
-            output_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        async with _decode_sem:
+            await asyncio.to_thread(_write_wav_16khz, file_path, output_path)
         
         return output_path
         
-    except subprocess.CalledProcessError as e:
+    except (av.FFmpegError, IndexError) as e:
         raise Exception(f"Failed to convert audio to 16kHz WAV: {str(e)}")
 
-async def convert_audio_if_needed(file_path: str) -> str:
-    """Convert audio to supported format if needed (for wma/wmv files)"""
+def convert_audio_to_wav_16khz_sync(file_path: str, output_path: Optional[str] = None) -> str:
+    """Blocking variant of convert_audio_to_wav_16khz for RQ workers"""
     try:
-        # Check if conversion is needed for wma/wmv files
-        file_ext = Path(file_path).suffix.lower()
+        if output_path is None:
+            output_path = _temp_wav_path()
         
-        if file_ext in ['.wma', '.wmv']:
-            # Convert to mp3 for better compatibility, then to 16kHz WAV
-            temp_mp3 = file_path.replace(file_ext, '.mp3')
-            
-            cmd = [
-                'ffmpeg', 
-                '-i', file_path,
-                '-acodec', 'mp3',
-                '-ab', '192k',
-                '-y',  # Overwrite output file
-                temp_mp3
-            ]
-            
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Remove original file
-            os.remove(file_path)
-            
-            # Now convert to 16kHz WAV
-            wav_output = await convert_audio_to_wav_16khz(temp_mp3)
-            
-            # Remove intermediate mp3
-            os.remove(temp_mp3)
-            
-            return wav_output
-        else:
-            # Convert directly to 16kHz WAV
-            wav_output = await convert_audio_to_wav_16khz(file_path)
-            
-            # Remove original file
-            os.remove(file_path)
-            
-            return wav_output
+        _write_wav_16khz(file_path, output_path)
         
-    except subprocess.CalledProcessError as e:
-        raise Exception(f"Failed to convert audio file: {str(e)}")
+        return output_path
+        
+    except (av.FFmpegError, IndexError) as e:
+        raise Exception(f"Failed to convert audio to 16kHz WAV: {str(e)}")
+
+async def convert_audio_if_needed(file_path: str) -> str:
+    """Convert audio to 16kHz WAV PCM mono (libav reads wma/wmv directly - no mp3 step)"""
+    wav_output = await convert_audio_to_wav_16khz(file_path)
+    
+    # Remove original file
+    await asyncio.to_thread(os.remove, file_path)
+    
+    return wav_output
 
 async def get_file_size_from_url(url: str) -> Optional[int]:
     """Get file size from URL without downloading (HEAD request)"""
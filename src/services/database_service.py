@@ -3,7 +3,8 @@ Database service for managing transcription results
 """
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
-from sqlalchemy import create_engine, MetaData
+import orjson
+from sqlalchemy import create_engine, MetaData, tuple_
 from sqlalchemy.orm import sessionmaker, Session
 
 try:
@@ -15,6 +16,17 @@ except ImportError:
     from config import settings
     from models import Base, TranscriptionResult, ApiUsageStats
 
+def _json_serializer(obj: Any) -> str:
+    """orjson-backed serializer for JSON/JSONB columns (handles numpy values from the models)"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def _engine_url(database_url: str) -> str:
+    """Pin the psycopg (v3) driver when the URL names none - SQLAlchemy would default to psycopg2"""
+    for scheme in ("postgresql://", "postgres://"):
+        if database_url.startswith(scheme):
+            return "postgresql+psycopg://" + database_url[len(scheme):]
+    return database_url
+
 class DatabaseService:
     """
     Service for managing transcription results in PostgreSQL
@@ -32,15 +44,25 @@ class DatabaseService:
         
         try:
             self.engine = create_engine(
-                settings.database_url,
+                _engine_url(settings.database_url),
                 echo=False,  # Set to True for SQL debugging
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
                 pool_pre_ping=True,
-                pool_recycle=300
+                pool_recycle=300,
+                pool_use_lifo=True,  # Reuse the most recent connection; idle extras age out
+                json_serializer=_json_serializer,
+                json_deserializer=orjson.loads
             )
             
             # Create all tables if they don't exist
             Base.metadata.create_all(bind=self.engine)
             
+            # create_all skips existing tables - add any indexes introduced since
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=self.engine, checkfirst=True)
+            
             # Create session factory
             self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
             
@@ -51,6 +73,17 @@ class DatabaseService:
             print(f"❌ Database initialization failed: {e}")
             raise
     
+    def ping(self) -> bool:
+        """
+        Lightweight liveness check - runs SELECT 1 on a raw driver connection,
+        bypassing ORM session and result-object construction
+        """
+        if not self.engine or not self._initialized:
+            raise RuntimeError("Database not initialized. Call initialize() during startup.")
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            return conn.exec_driver_sql("SELECT 1").scalar() == 1
+    
     def get_session(self):
         """Get a database session context manager"""
         if not self.SessionLocal or not self._initialized:
@@ -192,18 +225,40 @@ class DatabaseService:
         self,
         api_token: str,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after_task_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         List transcriptions for a specific API token using built-in Session context manager
+        
+        With after_task_id, returns the page after that task (keyset pagination,
+        cost independent of depth); offset is only used without a cursor.
         """
         try:
             with self.SessionLocal() as session:
-                transcriptions = session.query(TranscriptionResult).filter(
+                query = session.query(TranscriptionResult).filter(
                     TranscriptionResult.api_token == api_token
-                ).order_by(
-                    TranscriptionResult.created_at.desc()
-                ).offset(offset).limit(limit).all()
+                )
+                
+                if after_task_id:
+                    cursor_created_at = session.query(TranscriptionResult.created_at).filter(
+                        TranscriptionResult.task_id == after_task_id,
+                        TranscriptionResult.api_token == api_token
+                    ).scalar_subquery()
+                    query = query.filter(
+                        tuple_(TranscriptionResult.created_at, TranscriptionResult.task_id)
+                        < tuple_(cursor_created_at, after_task_id)
+                    )
+                
+                # order_by must come before offset/limit
+                query = query.order_by(
+                    TranscriptionResult.created_at.desc(),
+                    TranscriptionResult.task_id.desc()
+                )
+                if offset and not after_task_id:
+                    query = query.offset(offset)
+                
+                transcriptions = query.limit(limit).all()
                 
                 return [t.get_summary() for t in transcriptions]
                 
@@ -276,6 +331,3 @@ class DatabaseService:
 
 # Global database service instance
 db_service = DatabaseService()
-
-# Global database service instance
-db_service = DatabaseService()
\ No newline at end of file
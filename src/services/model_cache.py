@@ -2,6 +2,7 @@
 Whisper Model Cache Manager
 Efficiently caches Whisper models with resource management
 """
+import asyncio
 import os
 import pickle
 import hashlib
@@ -14,9 +15,13 @@ import torch
 try:
     # Try relative import first (for FastAPI app)
     from ..config import settings
+    from ..utils.gpu import enable_tf32
 except ImportError:
     # Fall back to absolute import (for RQ worker script)
     from config import settings
+    from utils.gpu import enable_tf32
+
+from .onnx_segmentation import attach_onnx_segmentation
 
 class WhisperModelCache:
     """
@@ -65,6 +70,12 @@ class WhisperModelCache:
         # Resource manager will be injected
         self.resource_manager = None
         
+        self._allocator_configured = False
+        
+        # pyannote pipeline shared by every AudioProcessor in this process
+        self.diarization_pipeline = None
+        self._diarization_lock = asyncio.Lock()
+        
         self.initialized = True
     
     def set_resource_manager(self, resource_manager):
@@ -227,6 +238,76 @@ class WhisperModelCache:
             print(f"Model {model_name} ready on CPU")
             return model
     
+    def configure_gpu_allocator(self):
+        """Tune the CUDA caching allocator and matmul precision once per worker process
+        
+        Cached blocks are kept between jobs (no empty_cache); large splits are
+        capped and segments made expandable to keep fragmentation down, and
+        headroom is left for the CTranslate2 allocator sharing the GPU.
+        FP32 matmuls and convolutions run on TF32 tensor cores (Ampere+).
+        """
+        if self._allocator_configured or not torch.cuda.is_available():
+            return
+        
+        for device in {torch.device(settings.whisper_device), torch.device(settings.diarization_device)}:
+            torch.cuda.set_per_process_memory_fraction(0.8, device)
+        if hasattr(torch.cuda.memory, "_set_allocator_settings"):
+            torch.cuda.memory._set_allocator_settings("max_split_size_mb:512,expandable_segments:True")
+        enable_tf32()
+        self._allocator_configured = True
+    
+    async def get_diarization_pipeline(self):
+        """Build the pyannote diarization pipeline once per process, return the shared instance"""
+        async with self._diarization_lock:
+            if self.diarization_pipeline is None:
+                from pyannote.audio import Pipeline
+                
+                print("Loading pyannote diarization pipeline")
+                pipeline = await asyncio.to_thread(
+                    Pipeline.from_pretrained,
+                    "pyannote/speaker-diarization-3.1",
+                    token=settings.hf_token
+                )
+                if torch.cuda.is_available():
+                    device = torch.device(settings.diarization_device)
+                    pipeline.to(device)
+                    onnx_segmentation = attach_onnx_segmentation(pipeline, settings.diarization_onnx_dir, device)
+                    if settings.compile_diarization:
+                        self._compile_diarization_models(pipeline, compile_segmentation=not onnx_segmentation)
+                self.diarization_pipeline = pipeline
+            
+            return self.diarization_pipeline
+    
+    @staticmethod
+    def _compile_diarization_models(pipeline, compile_segmentation: bool = True):
+        """Compile pyannote's segmentation and embedding networks into fused CUDA graphs
+        
+        Both run fixed-size windows over and over, so the one-off compile cost
+        is paid back within the first few jobs of the worker process.
+        """
+        torch_version = tuple(int(part) for part in torch.__version__.split("+")[0].split(".")[:2])
+        if torch_version < (2, 1):
+            return
+        
+        # Reuse compiled graphs from earlier worker processes (the models volume may be mounted read-only)
+        try:
+            os.makedirs(settings.torch_compile_cache_dir, exist_ok=True)
+        except OSError:
+            pass
+        if os.access(settings.torch_compile_cache_dir, os.W_OK):
+            os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", settings.torch_compile_cache_dir)
+            import torch._inductor.config as inductor_config
+            inductor_config.fx_graph_cache = True
+        
+        segmentation = getattr(pipeline, "_segmentation", None)
+        if compile_segmentation and segmentation is not None and hasattr(segmentation, "model"):
+            segmentation.model = torch.compile(segmentation.model, mode="reduce-overhead")
+        
+        embedding = getattr(pipeline, "_embedding", None)
+        if embedding is not None and hasattr(embedding, "model_"):
+            embedding.model_ = torch.compile(embedding.model_, mode="reduce-overhead")
+        print("Compiled pyannote segmentation/embedding models")
+    
     def _free_memory_if_needed(self):
         """Free some memory by removing cached models"""
         if len(self.cpu_cache) > 1:  # Keep at least one model
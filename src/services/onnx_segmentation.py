@@ -0,0 +1,88 @@
+"""
+ONNX Runtime backend for the pyannote segmentation model
+Runs the exported model (scripts/export_pyannote_onnx.py) with CUDA I/O binding:
+torch tensors are handed to ORT by device pointer, so chunks never leave the GPU.
+"""
+import os
+import threading
+from typing import Dict, Tuple
+import numpy as np
+import torch
+
+SEGMENTATION_ONNX = "segmentation.onnx"
+
+
+class OrtSegmentationForward:
+    """Drop-in replacement for the segmentation model's forward(waveforms) -> scores"""
+
+    def __init__(self, onnx_path: str, device: torch.device):
+        import onnxruntime as ort
+
+        self.device = device
+        self.device_id = device.index or 0
+        self.session = ort.InferenceSession(
+            onnx_path,
+            providers=[("CUDAExecutionProvider", {"device_id": self.device_id}), "CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_name = self.session.get_outputs()[0].name
+        self.io_binding = self.session.io_binding()
+        # input shape -> output shape, learned on the first call for each chunk batch shape
+        self._output_shapes: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, waveforms: torch.Tensor) -> torch.Tensor:
+        waveforms = waveforms.to(self.device, dtype=torch.float32).contiguous()
+        shape = tuple(waveforms.shape)
+
+        with self._lock:
+            # ORT reads the buffer on its own stream - the producing torch kernels must be done
+            torch.cuda.current_stream(self.device).synchronize()
+
+            binding = self.io_binding
+            binding.clear_binding_inputs()
+            binding.clear_binding_outputs()
+            binding.bind_input(
+                self.input_name, "cuda", self.device_id, np.float32, list(shape), waveforms.data_ptr()
+            )
+
+            output_shape = self._output_shapes.get(shape)
+            if output_shape is None:
+                # First batch of this shape: let ORT allocate, then remember the shape
+                binding.bind_output(self.output_name, "cuda", self.device_id)
+                self.session.run_with_iobinding(binding)
+                scores = torch.from_numpy(binding.copy_outputs_to_cpu()[0]).to(self.device)
+                self._output_shapes[shape] = tuple(scores.shape)
+                return scores
+
+            # Output written straight into a tensor from torch's caching allocator
+            scores = torch.empty(output_shape, dtype=torch.float32, device=self.device)
+            binding.bind_output(
+                self.output_name, "cuda", self.device_id, np.float32, list(output_shape), scores.data_ptr()
+            )
+            self.session.run_with_iobinding(binding)
+            return scores
+
+
+def attach_onnx_segmentation(pipeline, onnx_dir: str, device: torch.device) -> bool:
+    """Route the pipeline's segmentation forward through ONNX Runtime if an export and onnxruntime are available"""
+    onnx_path = os.path.join(onnx_dir, SEGMENTATION_ONNX)
+    segmentation = getattr(pipeline, "_segmentation", None)
+    if device.type != "cuda" or segmentation is None or not os.path.isfile(onnx_path):
+        return False
+
+    try:
+        ort_forward = OrtSegmentationForward(onnx_path, device)
+    except ImportError:
+        print("onnxruntime not installed - pyannote segmentation stays on PyTorch")
+        return False
+
+    if "CUDAExecutionProvider" not in ort_forward.session.get_providers():
+        print("onnxruntime has no CUDA provider - pyannote segmentation stays on PyTorch")
+        return False
+
+    # nn.Module.__call__ dispatches to the instance attribute; specifications,
+    # receptive field etc. are still read from the original model
+    segmentation.model.forward = ort_forward
+    print(f"pyannote segmentation running on ONNX Runtime: {onnx_path}")
+    return True
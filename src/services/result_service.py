@@ -1,7 +1,8 @@
 """
 Result service for managing transcription results with Redis cache + PostgreSQL persistence
 """
-import json
+import hashlib
+import orjson
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
 
@@ -18,6 +19,15 @@ except ImportError:
     
 from .database_service import db_service
 
+def result_etag(task_id: str, result) -> str:
+    """Strong ETag for a completed result, the same whether Redis or PostgreSQL served it
+    
+    Computed once when the result is stored and kept next to it under
+    transcription_result:{task_id}:etag, so GET /result never re-serializes it.
+    """
+    payload = orjson.dumps(result, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=str)
+    return '"' + hashlib.sha256(task_id.encode() + b":" + payload).hexdigest()[:32] + '"'
+
 class ResultService:
     """
     Service for managing transcription results with caching strategy:
@@ -80,14 +90,13 @@ class ResultService:
                 'status': 'completed',
                 'result': result_data,
                 'metadata': processing_metadata,
-                'cached_at': datetime.now(timezone.utc).isoformat()  # Modern timezone-aware datetime
+                'cached_at': datetime.now(timezone.utc)  # Modern timezone-aware datetime (orjson writes ISO 8601)
             }
             
-            self.redis_client.setex(
-                self._get_cache_key(task_id),
-                self.cache_ttl,
-                json.dumps(cache_data, default=str)
-            )
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(self._get_cache_key(task_id), self.cache_ttl, orjson.dumps(cache_data, default=str))
+                pipe.setex(self._get_cache_key(task_id, "etag"), self.cache_ttl, result_etag(task_id, result_data))
+                pipe.execute()
             
             # Update API usage stats
             await db_service.update_api_usage_stats(
@@ -137,13 +146,13 @@ class ResultService:
                 'status': 'failed',
                 'error': error_message,
                 'metadata': metadata,
-                'cached_at': datetime.now(timezone.utc).isoformat()  # Modern timezone-aware datetime
+                'cached_at': datetime.now(timezone.utc)  # Modern timezone-aware datetime (orjson writes ISO 8601)
             }
             
             self.redis_client.setex(
                 self._get_cache_key(task_id),
                 self.cache_ttl,
-                json.dumps(cache_data, default=str)
+                orjson.dumps(cache_data, default=str)
             )
             
             # Update API usage stats (failed request)
@@ -172,12 +181,14 @@ class ResultService:
         """
         try:
             # Step 1: Check Redis cache (transcription_result:task_id)
-            cache_key = f"transcription_result:{task_id}"
-            cached_data = self.redis_client.get(cache_key)
+            # The ETag stored with the result comes back in the same round-trip
+            cache_key = self._get_cache_key(task_id)
+            etag_key = self._get_cache_key(task_id, "etag")
+            cached_data, etag = self.redis_client.mget(cache_key, etag_key)
             
             if cached_data:
                 print(f"🚀 Result cache HIT for task {task_id}")
-                result = json.loads(cached_data)
+                result = orjson.loads(cached_data)
                 # Wrap in standard format if needed
                 if not isinstance(result, dict) or 'task_id' not in result:
                     return {
@@ -185,8 +196,10 @@ class ResultService:
                         'status': 'completed',
                         'result': result,
                         'transcription_text': result.get('text') if isinstance(result, dict) else None,
+                        'etag': etag,
                         'source': 'redis_cache'
                     }
+                result['etag'] = etag
                 return result
             
             print(f"💾 Result cache MISS for task {task_id}, checking database...")
@@ -207,8 +220,8 @@ class ResultService:
                 'result': db_result.get('formatted_result'),
                 'transcription_text': db_result.get('transcription_text'),
                 'metadata': {
-                    'created_at': str(db_result.get('created_at')) if db_result.get('created_at') else None,
-                    'completed_at': str(db_result.get('completed_at')) if db_result.get('completed_at') else None,
+                    'created_at': db_result.get('created_at'),
+                    'completed_at': db_result.get('completed_at'),
                     'processing_time_seconds': db_result.get('processing_time_seconds'),
                     'audio_duration_seconds': db_result.get('audio_duration_seconds'),
                     'word_count': db_result.get('word_count'),
@@ -219,16 +232,18 @@ class ResultService:
                     'format_type': db_result.get('format_type')
                 },
                 'error': db_result.get('error_message'),
-                'cached_at': datetime.now(timezone.utc).isoformat(),
+                'cached_at': datetime.now(timezone.utc),
                 'source': 'database'
             }
             
-            # Cache for future requests
-            self.redis_client.setex(
-                cache_key,
-                self.cache_ttl,
-                json.dumps(cache_data, default=str)
-            )
+            # Cache for future requests (orjson writes datetimes as ISO 8601),
+            # hashing a completed result once here rather than on every GET
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(cache_key, self.cache_ttl, orjson.dumps(cache_data, default=str))
+                if cache_data['status'] == 'completed':
+                    cache_data['etag'] = result_etag(task_id, cache_data['result'])
+                    pipe.setex(etag_key, self.cache_ttl, cache_data['etag'])
+                pipe.execute()
             
             return cache_data
             
@@ -271,7 +286,7 @@ class ResultService:
             
             if cached_data:
                 print(f"✅ RETURNING STATUS from result cache")
-                data = json.loads(cached_data)
+                data = orjson.loads(cached_data)
                 return {
                     'task_id': task_id,
                     'status': data.get('status', 'completed'),
@@ -318,7 +333,8 @@ class ResultService:
         self,
         api_token: str,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        after_task_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         List transcriptions for a user (from database)
@@ -327,7 +343,8 @@ class ResultService:
             return await db_service.list_transcriptions_by_token(
                 api_token=api_token,
                 limit=limit,
-                offset=offset
+                offset=offset,
+                after_task_id=after_task_id
             )
         except Exception as e:
             self.logger.error(f"Error listing transcriptions for token: {e}")
@@ -339,8 +356,7 @@ class ResultService:
         """
         try:
             # Delete from Redis cache
-            cache_key = self._get_cache_key(task_id)
-            self.redis_client.delete(cache_key)
+            self.redis_client.delete(self._get_cache_key(task_id), self._get_cache_key(task_id, "etag"))
             
             # Delete from database
             success = await db_service.delete_transcription(task_id, api_token)
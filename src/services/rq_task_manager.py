@@ -14,8 +14,34 @@ from typing import Dict, Any, Optional
 from rq import Queue
 from rq.job import Job
 from rq.exceptions import NoSuchJobError
+import orjson
 from ..config import settings
 
+# Pending batchable requests live in one list per compatibility group;
+# the set of group keys lets the batcher BLPOP across all of them
+BATCH_QUEUE_PREFIX = "batch_queue:"
+BATCH_GROUPS_KEY = "batch_queue:groups"
+
+# Drop a group from BATCH_GROUPS_KEY only if its list is still empty, atomically
+# with respect to enqueue_batchable pushing a new request into it
+_DISCARD_EMPTY_GROUP_LUA = """
+if redis.call('LLEN', KEYS[2]) == 0 then
+    return redis.call('SREM', KEYS[1], KEYS[2])
+end
+return 0
+"""
+
+
+def batch_group_key(model: str, language: str, diarization: bool) -> str:
+    """Requests sharing this key can be transcribed in the same batch"""
+    return f"{BATCH_QUEUE_PREFIX}{model}:{language}:{int(bool(diarization))}"
+
+
+def discard_empty_group(redis_conn, group_key) -> None:
+    """Stop the batcher polling a group whose list has been drained"""
+    redis_conn.eval(_DISCARD_EMPTY_GROUP_LUA, 2, BATCH_GROUPS_KEY, group_key)
+
+
 class RQTaskManager:
     """Manages task queuing and execution using Redis Queue (RQ)"""
     
@@ -60,6 +86,39 @@ class RQTaskManager:
         
         return task_id
     
+    async def enqueue_batchable(self, task_id: str, **task_params) -> str:
+        """Queue a task for the batcher, grouped with compatible requests"""
+        group_key = batch_group_key(
+            task_params.get("model"), task_params.get("language"), task_params.get("diarization")
+        )
+        
+        # Same status hash as create_task, plus the job payload in one round-trip
+        pipe = self.redis.pipeline()
+        pipe.hset(f"task:{task_id}", mapping={
+            "created_at": datetime.now().isoformat(),
+            "status": "queued",
+            "progress": 0,
+            "message": "Task queued for processing",
+            "batch_group": group_key
+        })
+        pipe.expire(f"task:{task_id}", 86400)
+        pipe.sadd(self.active_tasks_key, task_id)
+        pipe.expire(self.active_tasks_key, 86400)
+        pipe.sadd(BATCH_GROUPS_KEY, group_key)
+        pipe.rpush(group_key, orjson.dumps({"task_id": task_id, **task_params}))
+        pipe.execute()
+        
+        return task_id
+    
+    def _remove_from_batch_group(self, group_key: str, task_id: str) -> bool:
+        """Take a request out of its group list if the batcher has not picked it up yet"""
+        for item in self.redis.lrange(group_key, 0, -1):
+            if orjson.loads(item).get("task_id") == task_id:
+                removed = self.redis.lrem(group_key, 1, item)
+                discard_empty_group(self.redis, group_key)
+                return removed > 0
+        return False
+    
     async def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get task status and progress"""
         try:
@@ -121,7 +180,18 @@ class RQTaskManager:
             return result
             
         except NoSuchJobError:
-            return None
+            # Batched tasks have no RQ job of their own - report the task hash
+            task = self.redis.hgetall(f"task:{task_id}")
+            if not task:
+                return None
+            return {
+                "task_id": task_id,
+                "status": task.get("status", "unknown"),
+                "progress": float(task.get("progress", 0.0)),
+                "message": task.get("message", ""),
+                "created_at": task.get("created_at"),
+                "eta_seconds": None
+            }
         except Exception as e:
             print(f"Error getting task status: {e}")
             return None
@@ -146,10 +216,26 @@ class RQTaskManager:
             print(f"Error updating task progress: {e}")
     
     async def cancel_task(self, task_id: str) -> bool:
-        """Cancel a task"""
+        """Cancel a task - waiting for the batcher, inside a batched job, or as its own RQ job"""
         try:
-            job = Job.fetch(task_id, connection=self.redis)
-            job.cancel()
+            task_key = f"task:{task_id}"
+            task = self.redis.hgetall(task_key)
+            group_key = task.get("batch_group")
+            
+            if not (group_key and self._remove_from_batch_group(group_key, task_id)):
+                try:
+                    job = Job.fetch(task_id, connection=self.redis)
+                    job.cancel()
+                except NoSuchJobError:
+                    # Part of a multi-task batch job, which skips tasks marked canceled
+                    if not group_key or task.get("status") not in ("queued", "processing"):
+                        return False
+            
+            self.redis.hset(task_key, mapping={
+                "status": "canceled",
+                "message": "Task canceled by user",
+                "updated_at": datetime.now().isoformat()
+            })
             
             # Remove from active tasks
             self.redis.srem(self.active_tasks_key, task_id)
@@ -164,8 +250,6 @@ class RQTaskManager:
             
             return True
             
-        except NoSuchJobError:
-            return False
         except Exception as e:
             print(f"Error canceling task: {e}")
             return False
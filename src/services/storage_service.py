@@ -2,11 +2,12 @@
 Storage Service for handling file operations with MinIO S3 or local filesystem
 """
 import os
+import asyncio
+import shutil
 import tempfile
 import uuid
-from typing import Optional, Tuple, BinaryIO
+from typing import Optional, Tuple
 from pathlib import Path
-import aiofiles
 from minio import Minio
 from minio.error import S3Error
 
@@ -50,115 +51,69 @@ class StorageService:
             self.use_minio = False
             self.minio_client = None
     
-    async def save_upload_file(self, file: BinaryIO, original_filename: str, task_id: str) -> str:
+    @property
+    def is_local(self) -> bool:
+        """True when files are stored on the local filesystem (no MinIO)"""
+        return not (self.use_minio and self.minio_client)
+    
+    def local_path(self, storage_path: str) -> str:
+        """Resolve a local storage path to a filesystem path"""
+        if os.path.isabs(storage_path):
+            return storage_path
+        return os.path.join(settings.upload_dir, os.path.basename(storage_path))
+    
+    async def save_upload_path(self, local_path: str, original_filename: str, task_id: str) -> str:
         """
-        Save uploaded file and return the storage path/key
+        Upload a file that is already on local disk to MinIO without reading it into memory
+        
+        Only used with MinIO - in local mode the streamed upload already is the stored file.
         
         Args:
-            file: File-like object to save
-            original_filename: Original filename
+            local_path: Path of the file to store
+            original_filename: Original filename (used for the extension)
             task_id: Unique task identifier
             
         Returns:
             Storage path/key for the saved file
         """
-        # Generate unique filename
         file_extension = Path(original_filename).suffix.lower()
         storage_key = f"uploads/{task_id}_{uuid.uuid4()}{file_extension}"
         
-        if self.use_minio and self.minio_client:
-            return await self._save_to_minio(file, storage_key)
-        else:
-            return await self._save_to_local(file, storage_key)
-    
-    async def _save_to_minio(self, file: BinaryIO, storage_key: str) -> str:
-        """Save file to MinIO S3"""
         try:
-            # Read file content - handle different file types
-            if hasattr(file, 'read'):
-                read_method = file.read
-                if callable(read_method):
-                    import inspect
-                    if inspect.iscoroutinefunction(read_method):
-                        # Async read (FastAPI UploadFile)
-                        content = await read_method()
-                    else:
-                        # Sync read (SpooledTemporaryFile, regular file, BytesIO)
-                        content = read_method()
-                else:
-                    content = file
-            else:
-                # Already bytes
-                content = file
-            
-            # Handle empty content
-            if content is None or (isinstance(content, bytes) and len(content) == 0):
-                raise Exception("File content is empty")
-            
-            # Convert to bytes if needed
-            if isinstance(content, str):
-                content = content.encode()
-            elif not isinstance(content, bytes):
-                content = bytes(content)
-            
-            # MinIO put_object needs a file-like object with length
-            from io import BytesIO
-            data_stream = BytesIO(content)
-            
-            # Upload to MinIO
-            self.minio_client.put_object(
-                bucket_name=settings.minio_bucket_name,
-                object_name=storage_key,
-                data=data_stream,
-                length=len(content)
+            # fput_object streams from disk (multipart for large files)
+            await asyncio.to_thread(
+                self.minio_client.fput_object,
+                settings.minio_bucket_name,
+                storage_key,
+                local_path
             )
-            
             return f"s3://{settings.minio_bucket_name}/{storage_key}"
-            
         except Exception as e:
-            import traceback
-            print(f"ERROR in _save_to_minio: {e}")
-            print(traceback.format_exc())
             raise Exception(f"Failed to save file to MinIO: {e}")
     
-    async def _save_to_local(self, file: BinaryIO, storage_key: str) -> str:
-        """Save file to local filesystem"""
+    @staticmethod
+    async def ingest_local_path(src_path: str, dest_dir: str, dest_name: str) -> str:
+        """
+        Move a local file into dest_dir without copying it through Python
+        
+        Hardlinks when source and destination share a filesystem, otherwise
+        (e.g. a tmpfs /tmp and a mounted upload dir) falls back to
+        shutil.copyfile (sendfile on Linux). The source is removed either way.
+        
+        Returns:
+            Path of the ingested file
+        """
+        os.makedirs(dest_dir, exist_ok=True)
+        dest_path = os.path.join(dest_dir, dest_name)
+        
         try:
-            # Ensure upload directory exists
-            os.makedirs(settings.upload_dir, exist_ok=True)
-            
-            # Create local file path
-            local_path = os.path.join(settings.upload_dir, os.path.basename(storage_key))
-            
-            # Read file content - handle different file types
-            if hasattr(file, 'read'):
-                read_method = file.read
-                if callable(read_method):
-                    import inspect
-                    if inspect.iscoroutinefunction(read_method):
-                        # Async read (FastAPI UploadFile)
-                        content = await read_method()
-                    else:
-                        # Sync read (SpooledTemporaryFile, regular file)
-                        content = read_method()
-                else:
-                    content = file
-            else:
-                # Already bytes
-                content = file
-            
-            # Handle empty content
-            if content is None or (isinstance(content, bytes) and len(content) == 0):
-                raise Exception("File content is empty")
-            
-            # Write content to file
-            async with aiofiles.open(local_path, 'wb') as f:
-                await f.write(content)
-            
-            return local_path
-            
-        except Exception as e:
-            raise Exception(f"Failed to save file locally: {e}")
+            os.link(src_path, dest_path)
+        except OSError:
+            # Cross-device or hardlinks unsupported
+            await asyncio.to_thread(shutil.copyfile, src_path, dest_path)
+        os.remove(src_path)
+        
+        return dest_path
     
     async def download_file(self, storage_path: str) -> str:
         """
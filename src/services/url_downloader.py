@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Optional, Tuple
 from urllib.parse import urlparse
 import re
+from .storage_service import storage_service
 
 class URLDownloader:
     """Handle downloading audio/video from various URL sources using yt-dlp"""
@@ -77,9 +78,10 @@ class URLDownloader:
                 downloaded_file.unlink()  # Remove the file
                 raise Exception(f"Downloaded file too large: {actual_size/1024/1024:.1f}MB")
             
-            # Move to upload directory
-            final_path = os.path.join(upload_dir, f"{task_id}_{downloaded_file.name}")
-            os.rename(str(downloaded_file), final_path)
+            # Move to upload directory (temp dir may be on another filesystem)
+            final_path = await storage_service.ingest_local_path(
+                str(downloaded_file), upload_dir, f"{task_id}_{downloaded_file.name}"
+            )
             
             # Clean up temp directory
             os.rmdir(temp_dir)
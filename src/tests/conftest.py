@@ -0,0 +1,6 @@
+"""
+Test settings: no MinIO server here - services start in local-storage mode
+"""
+import os
+
+os.environ.setdefault("USE_MINIO", "false")
@@ -3,24 +3,58 @@
 Simple debug script to test API endpoints
 """
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import os
+import uuid
 
 BASE_URL = "http://localhost:8000"
 API_KEY = os.getenv("API_KEY", "mvp-api-key-123")
 AUDIO_FILE = "sample.mp3"
 
+# Reuse one keep-alive connection pool for every request
+session = requests.Session()
+session.headers.update({"Authorization": f"Bearer {API_KEY}"})
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+def stream_multipart(fields: dict, file_field: str, file_obj, filename: str,
+                     content_type: str, chunk_size: int = 64 * 1024):
+    """
+    Build a streaming multipart/form-data body.
+    Returns (generator, content_type); requests sends it with chunked transfer
+    encoding, so the audio file is never read fully into memory.
+    """
+    boundary = uuid.uuid4().hex
+    
+    def body():
+        for name, value in fields.items():
+            yield (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode()
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        while chunk := file_obj.read(chunk_size):
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+    
+    return body(), f"multipart/form-data; boundary={boundary}"
+
 print("🔍 Testing API Endpoints\n")
 
 # 1. Health check
 print("1️⃣ Testing /api/v1/system/health")
-response = requests.get(f"{BASE_URL}/api/v1/system/health")
+response = session.get(f"{BASE_URL}/api/v1/system/health")
 print(f"   Status: {response.status_code}")
 print(f"   Response: {response.json()}\n")
 
 # 2. System stats
 print("2️⃣ Testing /api/v1/system/stats")
-response = requests.get(f"{BASE_URL}/api/v1/system/stats")
+response = session.get(f"{BASE_URL}/api/v1/system/stats")
 print(f"   Status: {response.status_code}")
 print(f"   Response: {response.json()}\n")
 
@@ -28,14 +62,18 @@ print(f"   Response: {response.json()}\n")
 if os.path.exists(AUDIO_FILE):
     print(f"3️⃣ Testing /api/v1/transcribe with {AUDIO_FILE}")
     with open(AUDIO_FILE, "rb") as f:
-        files = {"file": (AUDIO_FILE, f, "audio/mpeg")}
-        headers = {"Authorization": f"Bearer {API_KEY}"}
         data = {
             "lang": "auto", 
             "format": "json",
             "model": "tiny"  # Specify model (tiny, base, small, medium, large)
         }
-        response = requests.post(f"{BASE_URL}/api/v1/transcribe", files=files, headers=headers, data=data)
+        # Stream the file in 64 KB chunks instead of buffering it in memory
+        body, content_type = stream_multipart(data, "file", f, AUDIO_FILE, "audio/mpeg")
+        response = session.post(
+            f"{BASE_URL}/api/v1/transcribe",
+            data=body,
+            headers={"Content-Type": content_type}
+        )
     
     print(f"   Status: {response.status_code}")
     print(f"   Response: {response.json()}\n")
@@ -46,8 +84,7 @@ if os.path.exists(AUDIO_FILE):
         # 4. Check status
         print(f"4️⃣ Testing /api/v1/status/{task_id}")
         time.sleep(2)
-        headers = {"Authorization": f"Bearer {API_KEY}"}
-        response = requests.get(f"{BASE_URL}/api/v1/status/{task_id}", headers=headers)
+        response = session.get(f"{BASE_URL}/api/v1/status/{task_id}")
         print(f"   Status: {response.status_code}")
         print(f"   Response: {response.json()}\n")
         
@@ -56,8 +93,9 @@ if os.path.exists(AUDIO_FILE):
             status = response.json().get("status")
             print(f"5️⃣ Waiting for transcription to complete...")
             
-            for i in range(120):  # Wait up to 2 minutes (120 * 3 = 360 seconds)
-                response = requests.get(f"{BASE_URL}/api/v1/status/{task_id}", headers=headers)
+            delay = 0.25  # Exponential backoff: start fast, cap at 5 seconds
+            for i in range(120):  # Wait up to ~10 minutes once the delay is capped
+                response = session.get(f"{BASE_URL}/api/v1/status/{task_id}")
                 if response.status_code == 200:
                     status = response.json().get("status")
                     progress = response.json().get("progress", 0)
@@ -69,11 +107,12 @@ if os.path.exists(AUDIO_FILE):
                     print(f"   ⚠️  Rate limited, waiting 5 seconds...")
                     time.sleep(5)
                     continue
-                time.sleep(3)  # Poll every 3 seconds instead of 1 second
+                delay = min(delay * 1.6, 5.0)
+                time.sleep(delay)
             
             if status == "completed":
                 print(f"\n6️⃣ Getting transcription result...")
-                response = requests.get(f"{BASE_URL}/api/v1/result/{task_id}", headers=headers)
+                response = session.get(f"{BASE_URL}/api/v1/result/{task_id}")
                 print(f"   Status: {response.status_code}")
                 if response.status_code == 200:
                     result = response.json()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Async debug script to test API endpoints (httpx variant of debug_ali.py)
+Health and stats are fetched concurrently over one pooled client
+"""
+import asyncio
+import os
+import httpx
+
+BASE_URL = "http://localhost:8000"
+API_KEY = os.getenv("API_KEY", "mvp-api-key-123")
+AUDIO_FILE = "sample.mp3"
+
+
+async def poll_until_done(client: httpx.AsyncClient, task_id: str) -> str:
+    """Poll task status with exponential backoff, return the final status"""
+    status = None
+    delay = 0.25
+    for i in range(120):
+        response = await client.get(f"/api/v1/status/{task_id}")
+        if response.status_code == 200:
+            status = response.json().get("status")
+            progress = response.json().get("progress", 0)
+            print(f"   [{i+1}/120] Status: {status}, Progress: {progress}%")
+
+            if status in ["completed", "failed"]:
+                break
+        elif response.status_code == 429:
+            print(f"   ⚠️  Rate limited, waiting 5 seconds...")
+            await asyncio.sleep(5)
+            continue
+        delay = min(delay * 1.6, 5.0)
+        await asyncio.sleep(delay)
+    return status
+
+
+async def main():
+    print("🔍 Testing API Endpoints (async)\n")
+
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={"Authorization": f"Bearer {API_KEY}"},
+        timeout=60.0
+    ) as client:
+        # 1+2. Health check and system stats are independent - run them together
+        print("1️⃣ Testing /api/v1/system/health and 2️⃣ /api/v1/system/stats")
+        health, stats = await asyncio.gather(
+            client.get("/api/v1/system/health"),
+            client.get("/api/v1/system/stats")
+        )
+        print(f"   Health status: {health.status_code}")
+        print(f"   Health response: {health.json()}")
+        print(f"   Stats status: {stats.status_code}")
+        print(f"   Stats response: {stats.json()}\n")
+
+        # 3. Transcribe audio
+        if not os.path.exists(AUDIO_FILE):
+            print(f"⚠️  Audio file '{AUDIO_FILE}' not found, skipping transcription test\n")
+            return
+
+        print(f"3️⃣ Testing /api/v1/transcribe with {AUDIO_FILE}")
+        with open(AUDIO_FILE, "rb") as f:
+            files = {"file": (AUDIO_FILE, f, "audio/mpeg")}
+            data = {
+                "lang": "auto",
+                "format": "json",
+                "model": "tiny"  # Specify model (tiny, base, small, medium, large)
+            }
+            response = await client.post("/api/v1/transcribe", files=files, data=data)
+
+        print(f"   Status: {response.status_code}")
+        print(f"   Response: {response.json()}\n")
+
+        if response.status_code != 200:
+            return
+
+        task_id = response.json().get("task_id")
+
+        # 4+5. Wait for completion
+        print(f"4️⃣ Waiting for transcription to complete...")
+        status = await poll_until_done(client, task_id)
+
+        if status == "completed":
+            print(f"\n5️⃣ Getting transcription result...")
+            response = await client.get(f"/api/v1/result/{task_id}")
+            print(f"   Status: {response.status_code}")
+            if response.status_code == 200:
+                result = response.json()
+                print(f"   Transcription text: {result.get('transcription_text', 'N/A')[:200]}...")
+            else:
+                print(f"   Response: {response.json()}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    print("✅ Done!")
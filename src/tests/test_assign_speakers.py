@@ -0,0 +1,77 @@
+"""
+Segment -> speaker mapping over the diarization turn array
+"""
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("faster_whisper")
+
+from src.services.audio_processor import TURN_DTYPE, AudioProcessor
+
+
+def _turns(rows):
+    return np.array(rows, dtype=TURN_DTYPE)
+
+
+def _loop_speaker(segment, speakers):
+    """The original per-segment scan over every speaker's turns"""
+    mid = (segment.get("start", 0) + segment.get("end", 0)) / 2
+    for speaker_id, turns in speakers.items():
+        for turn in turns:
+            if turn["start"] <= mid <= turn["end"]:
+                return speaker_id
+    return "SPEAKER_UNKNOWN"
+
+
+def _random_case(rng, overlapping):
+    rows, t = [], 0.0
+    for _ in range(rng.randint(1, 40)):
+        start = t + rng.uniform(0, 2)
+        end = start + rng.uniform(0.1, 10)
+        rows.append((start, end, f"{rng.randrange(4):02d}"))
+        t = start if overlapping else end
+    segments = [{"start": s, "end": s + rng.uniform(0, 5)} for s in (rng.uniform(-1, t + 10) for _ in range(50))]
+    return _turns(rows), segments
+
+
+def test_matches_loop_on_non_overlapping_turns():
+    rng = random.Random(0)
+    for _ in range(200):
+        turns, segments = _random_case(rng, overlapping=False)
+        speakers = AudioProcessor._speakers_dict(turns)
+        expected = [_loop_speaker(segment, speakers) for segment in segments]
+        assert AudioProcessor._assign_speakers(segments, turns) == expected
+
+
+def test_overlapping_turns_pick_a_covering_speaker():
+    rng = random.Random(1)
+    for _ in range(200):
+        turns, segments = _random_case(rng, overlapping=True)
+        speakers = AudioProcessor._speakers_dict(turns)
+        for segment, label in zip(segments, AudioProcessor._assign_speakers(segments, turns)):
+            expected = _loop_speaker(segment, speakers)
+            if expected == "SPEAKER_UNKNOWN":
+                assert label == "SPEAKER_UNKNOWN"
+            else:
+                mid = (segment["start"] + segment["end"]) / 2
+                assert any(t["start"] <= mid <= t["end"] for t in speakers[label])
+
+
+def test_long_turn_covers_after_shorter_one_ends():
+    turns = _turns([(0.0, 100.0, "00"), (10.0, 20.0, "01")])
+    segments = [{"start": 14, "end": 16}, {"start": 49, "end": 51}, {"start": 120, "end": 130}]
+    assert AudioProcessor._assign_speakers(segments, turns) == ["SPEAKER_01", "SPEAKER_00", "SPEAKER_UNKNOWN"]
+
+
+def test_unsorted_turns_and_boundaries():
+    turns = _turns([(5.0, 8.0, "01"), (0.0, 5.0, "00")])
+    segments = [{"start": 0, "end": 0}, {"start": 4, "end": 6}, {"start": 8, "end": 8}, {"start": 8, "end": 9}]
+    assert AudioProcessor._assign_speakers(segments, turns) == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_01", "SPEAKER_UNKNOWN"]
+
+
+def test_no_turns():
+    segments = [{"start": 0, "end": 1}, {"start": 1, "end": 2}]
+    assert AudioProcessor._assign_speakers(segments, _turns([])) == ["SPEAKER_UNKNOWN"] * 2
@@ -0,0 +1,97 @@
+"""
+Worker-side fetch of uploads: MinIO objects spooled in RAM or on disk, local paths
+"""
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.services import audio_tasks
+from src.services.audio_utils import load_audio_16k_mono, read_duration
+
+
+def _wav_bytes(seconds: float = 1.0) -> bytes:
+    samples = (np.sin(np.arange(int(16000 * seconds)) / 10) * 3000).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(16000)
+        out.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+class StubResponse(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.released = False
+
+    def release_conn(self):
+        self.released = True
+
+
+class StubMinio:
+    """Serves one object, like minio.Minio.get_object"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.requests = []
+        self.responses = []
+
+    def get_object(self, bucket, key):
+        self.requests.append((bucket, key))
+        self.responses.append(StubResponse(self.data))
+        return self.responses[-1]
+
+
+def _no_progress(percent, msg):
+    pass
+
+
+@pytest.mark.parametrize("memory_mb, spilled", [(64, False), (0, True)])
+def test_minio_object_is_spooled_and_decodable(monkeypatch, memory_mb, spilled):
+    monkeypatch.setattr(settings, "minio_memory_download_mb", memory_mb)
+    minio = StubMinio(_wav_bytes())
+
+    audio_file = audio_tasks._download_audio(
+        "ignored.wav", "s3://audio-files/uploads/t1.wav", _no_progress, minio=minio
+    )
+    try:
+        assert minio.requests == [(settings.minio_bucket_name, "uploads/t1.wav")]
+        assert minio.responses[0].closed and minio.responses[0].released
+        assert audio_file._rolled is spilled
+        assert read_duration(audio_file) == pytest.approx(1.0)
+        assert load_audio_16k_mono(audio_file).shape == (16000,)
+    finally:
+        audio_tasks._close_download(audio_file)
+    assert audio_file.closed
+
+
+def test_failed_minio_read_releases_connection():
+    class BrokenResponse(StubResponse):
+        def read(self, *args):
+            raise ConnectionResetError("connection reset")
+
+    class BrokenMinio(StubMinio):
+        def get_object(self, bucket, key):
+            self.responses.append(BrokenResponse(b""))
+            return self.responses[-1]
+
+    minio = BrokenMinio(b"")
+    with pytest.raises(ConnectionResetError):
+        audio_tasks._download_audio("x.wav", "uploads/x.wav", _no_progress, minio=minio)
+    assert minio.responses[0].closed and minio.responses[0].released
+
+
+def test_local_upload_resolves_to_its_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_tasks, "_minio_client", lambda: None)
+    upload = tmp_path / "t1_upload.wav"
+    upload.write_bytes(_wav_bytes())
+
+    assert audio_tasks._download_audio(str(upload), None, _no_progress) == str(upload)
+    assert audio_tasks._download_audio("x", str(upload), _no_progress) == str(upload)
+
+    with pytest.raises(Exception, match="File not found"):
+        audio_tasks._download_audio(str(tmp_path / "missing.wav"), None, _no_progress)
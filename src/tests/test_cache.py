@@ -0,0 +1,71 @@
+"""
+redis_memoize: single recompute under a Redis lock
+"""
+import asyncio
+
+import fakeredis
+import pytest
+from redis.exceptions import RedisError
+
+from src.utils import cache
+from src.utils.cache import redis_memoize
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache, "get_async_redis_client", lambda: client)
+    return client
+
+
+async def test_concurrent_misses_compute_once(fake_redis):
+    calls = []
+
+    @redis_memoize(ttl=2)
+    async def stats():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"workers": 3}
+
+    results = await asyncio.gather(*(stats() for _ in range(5)))
+    assert results == [{"workers": 3}] * 5
+    assert len(calls) == 1
+    assert not await fake_redis.exists("syscache:stats:lock")
+
+    # Served from the cache until the TTL runs out
+    assert await stats() == {"workers": 3}
+    assert len(calls) == 1
+
+
+async def test_failure_releases_lock_for_waiters(fake_redis):
+    calls = []
+
+    @redis_memoize(ttl=2)
+    async def broken():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        raise ZeroDivisionError
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await asyncio.gather(*(broken() for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ZeroDivisionError) for result in results)
+    assert not await fake_redis.exists("syscache:broken:lock")
+    # Waiters stop as soon as the lock is gone instead of polling for the whole TTL
+    assert loop.time() - started < 1
+    assert len(calls) == 3
+
+
+async def test_redis_down_serves_uncached(monkeypatch):
+    class DownRedis:
+        async def get(self, key):
+            raise RedisError("connection refused")
+
+    monkeypatch.setattr(cache, "get_async_redis_client", DownRedis)
+
+    @redis_memoize(ttl=2)
+    async def stats():
+        return {"workers": 1}
+
+    assert await stats() == {"workers": 1}
@@ -0,0 +1,85 @@
+"""
+Keyset pagination of a token's transcription history (on SQLite)
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Base, TranscriptionResult
+from src.services.database_service import DatabaseService
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def service():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = DatabaseService()
+    db.engine = engine
+    db.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db._initialized = True
+
+    # 7 rows for "tok": three pairs share a created_at, so task_id breaks the ties
+    rows = [("tok", f"task-{i:02d}", BASE_TIME + timedelta(seconds=i // 2)) for i in range(7)]
+    rows += [("other", f"other-{i}", BASE_TIME + timedelta(seconds=i)) for i in range(3)]
+    with db.SessionLocal() as session:
+        session.add_all(
+            TranscriptionResult(
+                task_id=task_id, api_token=token, created_at=created_at,
+                language="en", model="tiny", format_type="json", status="completed"
+            )
+            for token, task_id, created_at in rows
+        )
+        session.commit()
+    return db
+
+
+NEWEST_FIRST = [f"task-{i:02d}" for i in reversed(range(7))]
+
+
+async def _walk(service, limit):
+    """Follow after_task_id cursors the way /history clients do"""
+    pages, cursor = [], None
+    while True:
+        page = await service.list_transcriptions_by_token("tok", limit=limit, after_task_id=cursor)
+        pages.append([row["task_id"] for row in page])
+        if len(page) < limit:
+            return pages
+        cursor = page[-1]["task_id"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+async def test_cursor_walk_visits_every_row_once(service, limit):
+    pages = await _walk(service, limit)
+    assert [task_id for page in pages for task_id in page] == NEWEST_FIRST
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+async def test_cursor_inside_a_timestamp_tie(service):
+    # task-05 and task-04 share created_at - the page after task-05 starts at task-04
+    page = await service.list_transcriptions_by_token("tok", limit=2, after_task_id="task-05")
+    assert [row["task_id"] for row in page] == ["task-04", "task-03"]
+
+
+async def test_last_row_cursor_gives_empty_page(service):
+    assert await service.list_transcriptions_by_token("tok", limit=5, after_task_id="task-00") == []
+
+
+async def test_cursor_from_another_token_matches_nothing(service):
+    assert await service.list_transcriptions_by_token("tok", limit=5, after_task_id="other-2") == []
+
+
+async def test_offset_without_cursor(service):
+    page = await service.list_transcriptions_by_token("tok", limit=3, offset=2)
+    assert [row["task_id"] for row in page] == NEWEST_FIRST[2:5]
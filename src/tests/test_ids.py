@@ -0,0 +1,33 @@
+"""
+UUIDv7 task ids
+"""
+import uuid
+
+from src.utils import ids
+from src.utils.ids import new_uuid7
+
+
+def test_layout():
+    value = uuid.UUID(new_uuid7())
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_embeds_millisecond_timestamp(monkeypatch):
+    monkeypatch.setattr(ids.time, "time_ns", lambda: 1_700_000_000_123_456_789)
+    assert uuid.UUID(new_uuid7()).int >> 80 == 1_700_000_000_123
+
+
+def test_later_ids_sort_later(monkeypatch):
+    clock = iter(range(1_700_000_000_000, 1_700_000_001_000))
+    monkeypatch.setattr(ids.time, "time_ns", lambda: next(clock) * 1_000_000)
+
+    generated = [new_uuid7() for _ in range(1000)]
+    # Both as strings (the task_id column) and as UUIDs
+    assert sorted(generated) == generated
+    assert sorted(generated, key=uuid.UUID) == generated
+
+
+def test_unique_within_one_millisecond(monkeypatch):
+    monkeypatch.setattr(ids.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+    assert len({new_uuid7() for _ in range(1000)}) == 1000
@@ -0,0 +1,124 @@
+"""
+Sliding-window rate limiter: Redis Lua script and in-memory fallback
+"""
+import fakeredis
+import pytest
+from redis.exceptions import RedisError
+
+from src.config import settings
+from src.middleware import rate_limit, rate_limit_lua
+from src.middleware.rate_limit import ASGIRateLimit
+
+PERIOD_NS = 60 * 1_000_000_000
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Run the limiter's Lua script against an in-process Redis"""
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(rate_limit_lua, "SCRIPT", client.register_script(rate_limit_lua.SLIDING_WINDOW_LUA))
+    return client
+
+
+def _at(monkeypatch, now_ns: int):
+    """Pin the limiter's wall clock"""
+    monkeypatch.setattr(rate_limit_lua.time, "time_ns", lambda: now_ns)
+
+
+async def test_lua_allows_up_to_limit_then_rejects(fake_redis, monkeypatch):
+    _at(monkeypatch, 100 * PERIOD_NS)
+    results = [await rate_limit_lua.check_rate_limit("rl:test", 3, 60) for _ in range(4)]
+    assert results == [(True, 1), (True, 2), (True, 3), (False, 3)]
+
+
+async def test_lua_weights_previous_window(fake_redis, monkeypatch):
+    # Fill the limit at the end of one window
+    _at(monkeypatch, 101 * PERIOD_NS - 1)
+    for _ in range(4):
+        assert (await rate_limit_lua.check_rate_limit("rl:test", 4, 60))[0]
+
+    # On the boundary the previous window still counts in full
+    _at(monkeypatch, 101 * PERIOD_NS)
+    assert await rate_limit_lua.check_rate_limit("rl:test", 4, 60) == (False, 4)
+
+    # Halfway through, half of it has slid out
+    _at(monkeypatch, 101 * PERIOD_NS + PERIOD_NS // 2)
+    assert await rate_limit_lua.check_rate_limit("rl:test", 4, 60) == (True, 3)
+    assert await rate_limit_lua.check_rate_limit("rl:test", 4, 60) == (True, 4)
+    assert await rate_limit_lua.check_rate_limit("rl:test", 4, 60) == (False, 4)
+
+
+async def test_lua_keys_are_independent(fake_redis, monkeypatch):
+    _at(monkeypatch, 100 * PERIOD_NS)
+    assert await rate_limit_lua.check_rate_limit("rl:a", 1, 60) == (True, 1)
+    assert await rate_limit_lua.check_rate_limit("rl:a", 1, 60) == (False, 1)
+    assert await rate_limit_lua.check_rate_limit("rl:b", 1, 60) == (True, 1)
+
+
+def test_local_counter_slides_across_windows():
+    limiter = ASGIRateLimit(None, calls=4, period=60)
+    start = 1000 * PERIOD_NS
+
+    assert [limiter._check_local("c", start)[0] for _ in range(5)] == [True] * 4 + [False]
+
+    # Previous window counts in full on the boundary, half of it halfway through
+    assert limiter._check_local("c", start + PERIOD_NS) == (False, 4)
+    assert limiter._check_local("c", start + PERIOD_NS + PERIOD_NS // 2) == (True, 3)
+    assert limiter._check_local("c", start + PERIOD_NS + PERIOD_NS // 2) == (True, 4)
+    assert limiter._check_local("c", start + PERIOD_NS + PERIOD_NS // 2)[0] is False
+
+    # Two windows later nothing is left
+    assert limiter._check_local("c", start + 3 * PERIOD_NS) == (True, 1)
+
+
+def test_local_counter_caps_tracked_clients(monkeypatch):
+    monkeypatch.setattr(ASGIRateLimit, "MAX_CLIENTS", 3)
+    limiter = ASGIRateLimit(None, calls=1, period=60)
+    for client in "abcd":
+        limiter._check_local(client, PERIOD_NS)
+    assert list(limiter.clients) == ["b", "c", "d"]
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _call(limiter, headers):
+    """Send one request through the middleware, return (status, response headers)"""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "path": "/api/v1/status/x", "headers": headers, "client": ("10.0.0.1", 1234)}
+    await limiter(scope, None, send)
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+
+async def test_middleware_falls_back_to_memory_without_redis(monkeypatch):
+    async def redis_down(*args, **kwargs):
+        raise RedisError("connection refused")
+
+    monkeypatch.setattr(rate_limit, "check_rate_limit", redis_down)
+    limiter = ASGIRateLimit(_ok_app, calls=2, period=60)
+
+    first, headers = await _call(limiter, [])
+    assert first == 200 and headers[b"x-ratelimit-remaining"] == b"1"
+    assert (await _call(limiter, []))[0] == 200
+    assert (await _call(limiter, []))[0] == 429
+
+
+async def test_unvalidated_tokens_share_the_ip_bucket(fake_redis, monkeypatch):
+    _at(monkeypatch, 100 * PERIOD_NS)
+    limiter = ASGIRateLimit(_ok_app, calls=2, period=60)
+
+    statuses = [
+        (await _call(limiter, [(b"authorization", f"Bearer bogus-{i}".encode())]))[0]
+        for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+    # The real key gets its own bucket
+    valid = [(b"authorization", b"Bearer " + settings.api_key.encode())]
+    assert (await _call(limiter, valid))[0] == 200
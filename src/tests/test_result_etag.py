@@ -0,0 +1,78 @@
+"""
+GET /result ETags: stored with the result, answered with 304 on a match
+"""
+import fakeredis
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.auth import verify_api_key
+from src.routers import transcription
+from src.services import result_service as result_service_module
+from src.services.result_service import result_etag, result_service
+
+RESULT = {"text": " hello", "segments": [{"start": 0.0, "end": 1.5, "text": " hello"}], "language": "en"}
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(result_service, "redis_client", client)
+    return client
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(transcription.router)
+    app.dependency_overrides[verify_api_key] = lambda: "tok"
+    return TestClient(app)
+
+
+def _store(redis, task_id):
+    """Cache a finished result the way the worker does"""
+    redis.set(f"transcription_result:{task_id}", orjson.dumps(RESULT))
+    redis.set(f"transcription_result:{task_id}:etag", result_etag(task_id, RESULT))
+
+
+def test_etag_round_trip(redis, client, monkeypatch):
+    _store(redis, "t1")
+
+    # Served from the stored hash - the transcript is not serialized again
+    def no_hashing(*args):
+        raise AssertionError("ETag recomputed on GET")
+    monkeypatch.setattr(transcription, "result_etag", no_hashing)
+
+    first = client.get("/api/v1/result/t1")
+    assert first.status_code == 200
+    assert first.json()["result"] == RESULT
+    etag = first.headers["etag"]
+    assert etag == result_etag("t1", RESULT)
+
+    cached = client.get("/api/v1/result/t1", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+
+def test_mismatched_etag_gets_full_result(redis, client):
+    _store(redis, "t1")
+    response = client.get("/api/v1/result/t1", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json()["result"] == RESULT
+    assert response.headers["etag"] == result_etag("t1", RESULT)
+
+
+def test_database_fallback_stores_etag(redis, client, monkeypatch):
+    async def from_db(task_id):
+        return {"status": "completed", "formatted_result": RESULT, "transcription_text": RESULT["text"]}
+
+    monkeypatch.setattr(result_service_module.db_service, "get_transcription_result", from_db)
+
+    response = client.get("/api/v1/result/t2")
+    assert response.status_code == 200
+    # Same tag as the worker would have stored, and kept for the next GET
+    assert response.headers["etag"] == result_etag("t2", RESULT)
+    assert redis.get("transcription_result:t2:etag") == response.headers["etag"]
+    assert client.get("/api/v1/result/t2", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
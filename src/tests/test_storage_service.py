@@ -0,0 +1,76 @@
+"""
+Moving files into storage: hardlink fast path, copy fallback, MinIO upload
+"""
+import errno
+import os
+
+import pytest
+
+from src.config import settings
+from src.services import storage_service as storage_module
+from src.services.storage_service import StorageService
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "tmp" / "task_download.m4a"
+    path.parent.mkdir()
+    path.write_bytes(b"audio bytes")
+    return path
+
+
+async def test_ingest_hardlinks_on_same_filesystem(source, tmp_path, monkeypatch):
+    copies = []
+    monkeypatch.setattr(storage_module.shutil, "copyfile", lambda *args: copies.append(args))
+
+    dest = await StorageService.ingest_local_path(str(source), str(tmp_path / "uploads"), "t1_a.m4a")
+
+    assert dest == str(tmp_path / "uploads" / "t1_a.m4a")
+    assert open(dest, "rb").read() == b"audio bytes"
+    assert os.stat(dest).st_nlink == 1  # the source link is gone
+    assert not source.exists()
+    assert copies == []
+
+
+async def test_ingest_copies_across_filesystems(source, tmp_path, monkeypatch):
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(storage_module.os, "link", cross_device)
+
+    dest = await StorageService.ingest_local_path(str(source), str(tmp_path / "uploads"), "t1_a.m4a")
+
+    assert open(dest, "rb").read() == b"audio bytes"
+    assert not source.exists()
+
+
+async def test_save_upload_path_streams_to_minio(source):
+    class StubMinio:
+        def __init__(self):
+            self.calls = []
+
+        def fput_object(self, bucket, key, path):
+            self.calls.append((bucket, key, path))
+
+    service = StorageService()
+    service.use_minio, service.minio_client = True, StubMinio()
+
+    storage_path = await service.save_upload_path(str(source), "talk.M4A", "t1")
+
+    (bucket, key, path), = service.minio_client.calls
+    assert storage_path == f"s3://{bucket}/{key}"
+    assert bucket == settings.minio_bucket_name
+    assert key.startswith("uploads/t1_") and key.endswith(".m4a")
+    assert path == str(source)
+
+
+async def test_save_upload_path_wraps_minio_errors(source):
+    class FailingMinio:
+        def fput_object(self, *args):
+            raise ConnectionError("minio down")
+
+    service = StorageService()
+    service.use_minio, service.minio_client = True, FailingMinio()
+
+    with pytest.raises(Exception, match="Failed to save file to MinIO: minio down"):
+        await service.save_upload_path(str(source), "talk.m4a", "t1")
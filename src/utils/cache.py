@@ -0,0 +1,60 @@
+"""
+Short-lived Redis response cache for expensive read-only endpoints
+"""
+import asyncio
+import functools
+import orjson
+from redis.exceptions import RedisError
+from .redis_client import get_async_redis_client
+
+
+def redis_memoize(ttl: int = 2):
+    """Cache an async handler's JSON-serializable result in Redis for ttl seconds.
+
+    Only one request recomputes on a miss (SET NX lock); concurrent requests
+    wait for its result instead of piling onto the same expensive work.
+    """
+    def decorator(func):
+        key = f"syscache:{func.__name__}"
+        lock_key = f"{key}:lock"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            redis_client = get_async_redis_client()
+            locked = False
+            try:
+                cached = await redis_client.get(key)
+                if cached is None:
+                    locked = bool(await redis_client.set(lock_key, 1, nx=True, ex=ttl))
+                    if not locked:
+                        # Another request holds the lock - poll for its result,
+                        # giving up as soon as the lock is released without one
+                        for _ in range(ttl * 20):
+                            await asyncio.sleep(0.05)
+                            async with redis_client.pipeline(transaction=False) as pipe:
+                                cached, lock_held = await pipe.get(key).exists(lock_key).execute()
+                            if cached is not None or not lock_held:
+                                break
+                if cached is not None:
+                    return orjson.loads(cached)
+            except RedisError:
+                # Cache unavailable - serve uncached
+                return await func(*args, **kwargs)
+
+            try:
+                result = await func(*args, **kwargs)
+                try:
+                    await redis_client.set(key, orjson.dumps(result), ex=ttl)
+                except RedisError:
+                    pass
+                return result
+            finally:
+                # Released even when func raises, so waiters stop polling right away
+                if locked:
+                    try:
+                        await redis_client.delete(lock_key)
+                    except RedisError:
+                        pass
+
+        return wrapper
+    return decorator
@@ -0,0 +1,20 @@
+"""
+Process-wide CUDA math settings
+"""
+
+
+def enable_tf32() -> None:
+    """Run FP32 matmuls and convolutions on TF32 tensor cores (Ampere+).
+
+    Process-wide flags, so every worker entry point sets them once at startup;
+    a no-op without torch or a GPU.
+    """
+    try:
+        import torch
+    except ImportError:
+        return
+    if not torch.cuda.is_available():
+        return
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.set_float32_matmul_precision("high")
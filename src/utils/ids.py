@@ -0,0 +1,19 @@
+"""
+Time-sortable identifiers for database keys
+"""
+import os
+import time
+import uuid
+
+
+def new_uuid7() -> str:
+    """UUIDv7 (RFC 9562): 48-bit Unix ms timestamp followed by random bits.
+
+    IDs created later sort later, both as UUIDs and as their 36-char strings,
+    so primary-key inserts append to the right edge of the B-tree.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    # Overwrite the version (0111) and variant (10) bits
+    value = value & ~(0xF << 76) | (0x7 << 76)
+    value = value & ~(0x3 << 62) | (0x2 << 62)
+    return str(uuid.UUID(int=value))
@@ -2,8 +2,9 @@
 Centralized logging configuration for the audio diarization service
 """
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 from pathlib import Path
 
@@ -19,6 +20,7 @@ class AudioDiarizationLogger:
     
     _instance: Optional['AudioDiarizationLogger'] = None
     _initialized = False
+    _listener: Optional[QueueListener] = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -90,6 +92,39 @@ class AudioDiarizationLogger:
         logging.getLogger("minio").setLevel(logging.WARNING)
         logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     
+    def start_queue_listener(self):
+        """Hand formatting and file/stdout I/O to a background thread
+        
+        Callers (e.g. the event loop) only enqueue records. Not used in RQ
+        workers: the listener thread would not survive the fork into the work horse.
+        """
+        if self._listener is not None:
+            return
+        
+        root_logger = logging.getLogger()
+        handlers = root_logger.handlers[:]
+        for handler in handlers:
+            root_logger.removeHandler(handler)
+        
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(QueueHandler(log_queue))
+        self._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+    
+    def stop_queue_listener(self):
+        """Flush queued records and give the handlers back to the root logger"""
+        if self._listener is None:
+            return
+        
+        self._listener.stop()
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers[:]:
+            if isinstance(handler, QueueHandler):
+                root_logger.removeHandler(handler)
+        for handler in self._listener.handlers:
+            root_logger.addHandler(handler)
+        self._listener = None
+    
     def get_logger(self, name: str = None) -> logging.Logger:
         """Get a logger instance"""
         if name:
@@ -2,6 +2,7 @@
 Redis connection utilities for consistent Redis client management
 """
 import redis
+import redis.asyncio as aioredis
 from typing import Optional
 
 try:
@@ -70,4 +71,17 @@ def get_redis_client() -> redis.Redis:
 
 def get_raw_redis_client() -> redis.Redis:
     """Get Redis client for binary data"""
-    return redis_manager.get_raw_client()
\ No newline at end of file
+    return redis_manager.get_raw_client()
+
+_async_redis_client: Optional[aioredis.Redis] = None
+
+def get_async_redis_client() -> aioredis.Redis:
+    """Get the shared asyncio Redis client (binary responses) for code on the event loop"""
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=5,
+            socket_timeout=5
+        )
+    return _async_redis_client
\ No newline at end of file